@@ -2,18 +2,25 @@
 
 import sys 
 import streamlit as st
-import time
 from datetime import datetime
 import random
-from concurrent.futures import ThreadPoolExecutor
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
 
 
 # --- Required Imports ---
 # These modules are assumed to exist in your project structure
-from timer import start_timer, elapsed # Assumes functions for timing
+from timer import start_timer, elapsed, pause # Assumes functions for timing
 from llm_client import map_to_category, evaluate_responses # Assumes functions for LLM interaction
-from feedback_engine import SessionState, PHASES, CATEGORY_LIST, SUGGESTION_LIST # Use components from your feedback_engine.py
+from feedback_engine import SessionState, PHASES, CATALOG # Use components from your feedback_engine.py
 from logger import log # Assumes a logging function
+import logger
+import llm_client
+import pre_classifier
+import usage_ledger
+from originality_index import OriginalityIndex
+from live_stats import LiveStats
+from session_lifecycle import SessionLifecycle, SessionRegistry, COMPLETED, ABANDONED
 
 # --- Get Prolific query params ---
 params = st.query_params
@@ -25,27 +32,61 @@ return_url = params.get("return_url", default_return_url)
 
 # ── 1.  Background executor lives for the whole app ───────────────────────
 # Pick the best decorator available
-singleton = getattr(st, "singleton",
+singleton = getattr(st, "cache_resource",
+            getattr(st, "singleton",
             getattr(st, "experimental_singleton",
-                    lambda **kw: (lambda f: f)))   # no-op fallback
+                    lambda **kw: (lambda f: f))))   # no-op fallback
 
 @singleton(show_spinner=False)
 def get_log_executor() -> ThreadPoolExecutor:
     return ThreadPoolExecutor(max_workers=1, thread_name_prefix="logger")
 
 
+@singleton(show_spinner=False)
+def get_originality_index() -> OriginalityIndex:
+    return OriginalityIndex()
+
+
 log_executor = get_log_executor()
+originality_index = get_originality_index()
 
 def async_log(data: dict):
     """Queue logging on the executor so UI can refresh immediately."""
     def _safe_log(d):
         try:
             log(d)
+            originality_index.add_entry(d) # Keep the originality index in step with the log
         except Exception:
             import traceback
             traceback.print_exc(file=sys.stderr)
+        finally:
+            live_stats.log_done()
+
+    live_stats.add_entry(data)
+    live_stats.log_queued()
+    return log_executor.submit(_safe_log, data)
+
 
-    log_executor.submit(_safe_log, data)
+@singleton(show_spinner=False)
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+
+
+@singleton(show_spinner=False)
+def get_session_registry() -> SessionRegistry:
+    return SessionRegistry()
+
+
+@singleton(show_spinner=False)
+def get_live_stats() -> LiveStats:
+    """Aggregates for monitor.py, fed alongside the log and the usage ledger."""
+    stats = LiveStats()
+    usage_ledger.add_listener("live_stats", stats.add_llm_call)
+    stats.add_source("sessions", get_session_registry().stats)
+    return stats.start()
+
+
+live_stats = get_live_stats()
 # ───────────────────────────────────────────────────────────────────────────
 
 def simple_levenshtein(s1, s2):
@@ -71,14 +112,19 @@ def simple_levenshtein(s1, s2):
 
 # -----------------------------------------
 # Every time you need to show / update the list:
+RESPONSE_DISPLAY_CAP = 45   # most recent uses shown; older ones are summarised
+
 def show_responses(responses, disqualified):
     if not responses:
         return
 
-    num_cols = min(3, len(responses))
+    hidden = max(0, len(responses) - RESPONSE_DISPLAY_CAP)
+    num_cols = 3
     cols = st.columns(num_cols)
 
-    for i, r in enumerate(responses):
+    # Items keep their column/row position as the list grows (append-only),
+    # so the frontend only has to draw the newly added use.
+    for i, r in enumerate(responses[hidden:], start=hidden):
         col = cols[i % num_cols]
         use_text = r['use_text']
         if r.get("category") == "Disqualified":
@@ -88,34 +134,175 @@ def show_responses(responses, disqualified):
 
         col.markdown(display_text)
 
+    if hidden:
+        st.caption(f"+ {hidden} earlier responses not shown")
+
+
+# -----------------------------------------
+# Phase-end evaluation and recess prefetch
+EVAL_TIMEOUT_SEC = 30   # max wait for a background evaluation when the recess ends
+
+def apply_evaluation(records, eval_result):
+    """Mark records disqualified by the phase-end evaluation; return their texts."""
+    print(eval_result)
+    for r in records:
+        if r["use_text"] in eval_result.get("disqualified", []):
+            r["category"] = "Disqualified"
+    return [r["use_text"] for r in records if r["category"] == "Disqualified"]
+
+
+def prefetch_next_phase(records, evaluated_object):
+    """Use the recess to warm the next phase's cold paths in the background."""
+    executor = get_prefetch_executor()
+    def submit(fn, *args): # Carry the usage-ledger tags into the worker thread
+        return executor.submit(contextvars.copy_context().run, fn, *args)
+
+    if records:
+        st.session_state.pending_evaluation = (submit(evaluate_responses, evaluated_object, list(records)), records)
+    if session.current_phase["hints"] and hint_enabled_for_group:
+        st.session_state.current_hints = session.get_hint()
+        st.session_state.hint_phase = session.phase_index
+    submit(llm_client.warm_up)
+    submit(pre_classifier.warm_up, session.current_object) # First classifications for the next object
+    # Runs after this participant's queued log writes on the single log worker
+    st.session_state.pending_futures.append(log_executor.submit(logger.warm_up))
+
+
+def finish_prefetch():
+    """At recess end: apply the evaluation and flush this participant's logs."""
+    pending = st.session_state.pop("pending_evaluation", None)
+    if pending:
+        future, records = pending
+        try:
+            eval_result = future.result(timeout=EVAL_TIMEOUT_SEC)
+        except Exception as e:
+            print("Evaluation error:", e)
+            eval_result = {"disqualified": [], "used_categories": []}
+        disqualified = apply_evaluation(records, eval_result)
+        if records is st.session_state.responses: # Not cleared for the last phase
+            st.session_state.disqualified = disqualified
+    futures = st.session_state.pending_futures
+    wait(futures, timeout=5)
+    futures[:] = [f for f in futures if not f.done()]
+
+
+# -----------------------------------------
+# Fragments: each reruns on its own instead of re-executing the whole page.
+@st.fragment(run_every=1)
+def timer_panel(duration):
+    """Tick the countdown once a second; trigger a full rerun at phase end."""
+    remaining = duration - elapsed(st.session_state.session.phase_start)
+    if remaining <= 0:
+        st.markdown("⏱️ Time remaining: **00:00**")
+        st.rerun() # Full rerun runs the phase transition logic
+    mins, secs = divmod(int(remaining), 60)
+    st.markdown(f"⏱️ Time remaining: **{mins:02d}:{secs:02d}**")
+
+
+@st.fragment
+def hint_panel():
+    hints = st.session_state.get("current_hints", [])
+    if hints:
+        st.markdown("**Hint: You could try a use related to the following categories\n (but it is forbidden to use the category names) :**")
+        for h in hints:
+            st.markdown(f"- {h}")
+
+
+@st.fragment
+def submission_panel(obj, phase_info):
+    """Input form plus the response list; a submission reruns only this panel."""
+    session = st.session_state.session
+    tag_llm_usage() # Fragment reruns start on a fresh thread context
+
+    with st.form(key="use_form", clear_on_submit=True):
+        use = st.text_input("Enter one use:", key=f"use_{session.phase_index}") # clear_on_submit empties it
+        submitted = st.form_submit_button("Submit use")
+
+    # The timer tick that ends the phase may be late (browsers throttle
+    # background tabs): a use sent after time is up is not recorded, and the
+    # full rerun runs the phase transition as it did before fragments.
+    if submitted and elapsed(session.phase_start) >= phase_info["duration_sec"]:
+        st.rerun()
+
+    if submitted and use.strip():
+        standardized_use = use.strip().lower()
+
+        existing_uses = [r["use_text"].strip().lower() for r in st.session_state.responses]
+
+        # Check for exact duplicate
+        if standardized_use in existing_uses:
+            st.warning("⚠️ You already submitted that exact use! Try a different idea.")
+
+        # Check for very close match (distance 1–2)
+        elif any(simple_levenshtein(standardized_use, prev_use) <= 2 for prev_use in existing_uses):
+            st.warning("⚠️ Your idea is very similar to a previous one! Try a more different idea.")
+
+        else:
+            # Record the use via SessionState method
+            # This method handles timing relative to phase start and calls map_to_category
+            response_record = session.record_use(use)
+
+            # Append full record for potential evaluation and logging
+            full_record = {
+                **response_record, # Includes trial, use_text, category, response_time_sec
+                "phase_index": session.phase_index,
+                "object": obj
+            }
+            st.session_state.responses.append(full_record)
+            st.toast("✅ Response recorded.")
+            # Log the response
+            log_data = {
+                "timestamp": datetime.utcnow().isoformat(),
+                "participant": participant,
+                "study_id": study_id,
+                "group_id": group_id,
+                "phase_name": phase_info["name"],
+                "phase_index": session.phase_index,
+                "object": obj,
+                "trial": response_record["trial"],
+                "use_text": use,
+                "category": response_record["category"],
+                "category_source": response_record["category_source"],
+                "category_confidence": response_record["category_confidence"],
+                "response_time_sec_phase": response_record["response_time_sec"], # Time since phase start
+                "hints_enabled_group": hint_enabled_for_group,
+                "shown_hints": st.session_state.get("current_hints", []) # Log the hints that were actually shown
+            }
+            # **Non-blocking** logging; keep only futures still in flight
+            pending = st.session_state.pending_futures
+            pending[:] = [f for f in pending if not f.done()]
+            pending.append(async_log(log_data))
+            st.session_state.lifecycle.touch(st.session_state)
+
+    # --- Display Responses ---
+    if st.session_state.responses:
+        st.subheader("Your responses so far:")
+        show_responses(st.session_state.responses, st.session_state.disqualified)
+
 
 # --- Group Assignment ---
 # Assign group based on participant_id once
 if "group_id" not in st.session_state:
-    # Use a simple hash for demonstration if participant ID exists, else random
-    # Ensure hash result is an integer before modulo
-    try:
-        p_hash = int(hash(participant))
-        st.session_state.group_id = p_hash % 4 if participant else random.randint(0, 3)
-    except Exception: # Fallback if hashing fails
-         st.session_state.group_id = random.randint(0, 3)
+    # Stable digest of the participant ID (hash() is salted per process, so a
+    # reconnect after a restart would land elsewhere); random without an ID
+    n_groups = len(CATALOG.groups)
+    if participant:
+        st.session_state.group_id = CATALOG.assign_group(participant)
+    else:
+        st.session_state.group_id = random.randrange(n_groups)
 
 
 
 
 group_id = st.session_state.group_id
 
-# Group assignments determine object order and hint availability
-# Object order: Groups 0, 1 get brick then newspaper; Groups 2, 3 get newspaper then brick
-# Hint availability: Groups 0, 2 have hints enabled during the extension phase (phase 1)
-if group_id in [0, 1]:
-    # First object for phases 0, 1; Second object for phase 2 ('transfer')
-    object_order = ["brick", "newspaper"]
-else:
-    object_order = ["newspaper", "brick"]
+# Group assignments determine object order and hint availability; both are
+# generated from the study definition's schedule (see catalog.py)
+group = CATALOG.groups[group_id]
+object_order = list(group.objects) # Object per slot, e.g. [first object, transfer object]
 
-# Hint enabled for groups 0 and 2 (controlled within SessionState based on phase)
-hint_enabled_for_group = group_id in [0, 2]
+# Hints shown in the study's hint phases (controlled within SessionState based on phase)
+hint_enabled_for_group = group.hints
 
 # --- Initialize Session State ---
 if "session" not in st.session_state:
@@ -123,7 +310,7 @@ if "session" not in st.session_state:
     # Pass hint availability based on group
     st.session_state.session = SessionState(objects=object_order, hints=hint_enabled_for_group)
     st.session_state.started = False
-    # Store responses per phase block - cleared before the last phase
+    # Store responses per phase block - cleared when the object changes
     st.session_state.responses = []
     st.session_state.recess_mode = False
     # Store disqualified responses if using evaluate_responses
@@ -139,6 +326,26 @@ if "disqualified" not in st.session_state:
 if "pending_futures" not in st.session_state:
     st.session_state.pending_futures = []
 
+
+def tag_llm_usage():
+    """Tag LLM calls from this script/fragment run for the usage ledger."""
+    usage_ledger.set_context(participant=participant, study_id=study_id,
+                             group_id=group_id, phase_index=session.phase_index)
+
+tag_llm_usage()
+
+# --- Session lifecycle ---
+if "lifecycle" not in st.session_state:
+    st.session_state.lifecycle = SessionLifecycle(participant)
+    get_session_registry().register(st.session_state.lifecycle)
+lifecycle = st.session_state.lifecycle
+lifecycle.touch(st.session_state)
+get_session_registry().sweep() # Rate-limited; evicts sessions idle past the TTL
+
+if lifecycle.state == ABANDONED:
+    st.warning("This session expired after a long period of inactivity. Please return the study on Prolific.")
+    st.stop()
+
 # --- App Flow ---
 
 if not st.session_state.started:
@@ -182,16 +389,27 @@ else:
 
     # Check if study is complete
     if session.phase_index >= len(PHASES):
+        # release() below clears the responses in place, so reruns of this
+        # screen (reconnect, widget events) render a slim stored copy and
+        # skip the pause and the log flush
+        first_visit = lifecycle.state != COMPLETED
+        if first_visit:
+            st.session_state.final_responses = [
+                {"use_text": r["use_text"], "category": r.get("category")}
+                for r in st.session_state.responses
+            ]
+
         st.success("🎉 You have completed the study!")
-        st.balloons()
+        if first_visit:
+            st.balloons()
         
         # show answers straight away
         st.subheader("Your responses in this last phase:")
-        show_responses(st.session_state.responses,
-                       st.session_state.disqualified)
+        show_responses(st.session_state.get("final_responses", []), [])
 
         # keep them on screen for ~10 s (blocking but simple)
-        time.sleep(5)
+        if first_visit:
+            pause(5)
         # Provide a clickable link to return to Prolific
         completion_code = "C6KNGZWE" # Replace with your actual Prolific completion code
         prolific_url = f"{return_url}?cc={completion_code}" if return_url != default_return_url else f"https://app.prolific.com/submissions/complete?cc={completion_code}"
@@ -207,23 +425,30 @@ else:
         </a>
         """, unsafe_allow_html=True)
         st.markdown(f"Or copy this code: `{completion_code}`")
-        for fut in st.session_state.pending_futures:
-            try:
-                fut.result(timeout=5)   # 5 s should be plenty
-            except Exception:
-                pass                    # already printed inside _safe_log
-            
+        if first_visit:
+            for fut in st.session_state.pending_futures:
+                try:
+                    fut.result(timeout=5)   # 5 s should be plenty
+                except Exception:
+                    pass                    # already printed inside _safe_log
+
+            # Logs are flushed: release this participant's per-session data
+            lifecycle.release(COMPLETED)
         st.stop() # Stop script execution after completion
 
     # Check for recess mode
     elif st.session_state.recess_mode:
         st.header("🧘 Take a short break")
-        st.write("You can rest for 20 seconds. The next phase will start automatically.")
+        recess_duration = CATALOG.recess_sec
+        st.write(f"You can rest for {recess_duration} seconds. The next phase will start automatically.")
         countdown = st.empty()
-        recess_duration = 20 # Standard 30 second break
         for i in range(recess_duration, 0, -1):
             countdown.markdown(f"⏳ Resuming in **{i}** seconds...")
-            time.sleep(1)
+            pause(1)
+        finish_prefetch()
+        # The next phase's clock starts only now, so a slow evaluation
+        # during the break never eats into the participant's time
+        session.start_phase()
         st.session_state.recess_mode = False
         st.rerun()
 
@@ -234,207 +459,78 @@ else:
              session.start_phase()
 
         # --- Setup or reset hints depending on phase ---
-        if session.phase_index == 1 and hint_enabled_for_group:
-            if st.session_state.get("hint_phase", -1) != 1:
-                # Phase 2 entered, and hints group → generate hints
+        if session.current_phase["hints"] and hint_enabled_for_group:
+            if st.session_state.get("hint_phase", -1) != session.phase_index:
+                # Hint phase entered, and hints group → generate hints
                 st.session_state.current_hints = session.get_hint()
-                st.session_state.hint_phase = 1
+                st.session_state.hint_phase = session.phase_index
         else:
             if st.session_state.get("hint_phase", -1) != session.phase_index:
                 # Different phase entered → clear hints
                 st.session_state.current_hints = []
                 st.session_state.hint_phase = session.phase_index
 
-            
+
 
         obj = session.current_object # Get object from SessionState property
         phase_info = session.current_phase # Get phase info from SessionState property
         duration = phase_info["duration_sec"]
 
 
-        st.subheader(f"{phase_info['name'].title()}: ")
-        st.header(f"★★★  {obj.upper()}  ★★★")
-        st.markdown(f"**Participant:** `{participant or 'TEST'}` | **Group:** `{group_id}` | **Phase:** `{session.phase_index + 1}/{len(PHASES)}`")
-
-        timer_placeholder = st.empty()
-        form_placeholder = st.empty() # Placeholder for the form
-
-        with form_placeholder.form(key="use_form", clear_on_submit=True):
-            use = st.text_input("Enter one use:", key=f"use_{session.phase_index}_{session.trial_count}")
-
-            
-            # --- Hint Logic ---
-            hint_placeholder = st.empty()
-
-            hints = st.session_state.get("current_hints", [])
-
-            if hints:
-                with hint_placeholder.container():
-                    st.markdown("**Hint: You could try a use related to the following categories\n (but it is forbidden to use the category names) :**")
-                    for h in hints:
-                        st.markdown(f"- {h}")
-            else:
-                hint_placeholder.empty()
-            # --- End Hint Logic ---
-
-
-            submitted = st.form_submit_button("Submit use")
-
-        if submitted and use.strip():
-            standardized_use = use.strip().lower()
-
-            existing_uses = [r["use_text"].strip().lower() for r in st.session_state.responses]
-
-            # Check for exact duplicate
-            if standardized_use in existing_uses:
-                st.warning("⚠️ You already submitted that exact use! Try a different idea.")
-
-            # Check for very close match (distance 1–2)
-            elif any(simple_levenshtein(standardized_use, prev_use) <= 2 for prev_use in existing_uses):
-                st.warning("⚠️ Your idea is very similar to a previous one! Try a more different idea.")
-
-            else:
-            
-                # Record the use via SessionState method
-                # This method handles timing relative to phase start and calls map_to_category
-                response_record = session.record_use(use)
-
-                # Append full record for potential evaluation and logging
-                full_record = {
-                    **response_record, # Includes trial, use_text, category, response_time_sec
-                    "phase_index": session.phase_index,
-                    "object": obj
-                }
-                st.session_state.responses.append(full_record)
-                st.success("✅ Response recorded.")
-                time.sleep(0.5) # Keep success message visible briefly                
-                # Log the response
-                log_data = {
-                    "timestamp": datetime.utcnow().isoformat(),
-                    "participant": participant,
-                    "study_id": study_id,
-                    "group_id": group_id,
-                    "phase_name": phase_info["name"],
-                    "phase_index": session.phase_index,
-                    "object": obj,
-                    "trial": response_record["trial"],
-                    "use_text": use,
-                    "category": response_record["category"],
-                    "response_time_sec_phase": response_record["response_time_sec"], # Time since phase start
-                    "hints_enabled_group": hint_enabled_for_group,
-                    "shown_hints": hints # Log the hints that were actually shown
-                }
-                #log(log_data) # Call your logging function
-                # **Non-blocking** logging
-                future = async_log(log_data)
-                st.session_state.pending_futures.append(future)   # optional
-                
-                st.rerun() # Rerun to update timer and clear form
-
-
-        # --- Display Disqualified/Responses ---
-        last_phase_index = len(PHASES) - 1
-
-
-                
-        responses_box = st.empty()
-
-        if st.session_state.responses:
-            with responses_box.container():
-                st.subheader("Your responses so far:")
-                show_responses(st.session_state.responses, st.session_state.disqualified)
-        else:
-            responses_box.empty()
-
-
-
-
+        # --- Phase end (triggered by the timer fragment's full rerun) ---
+        if elapsed(session.phase_start) >= duration:
+             times_up_placeholder = st.empty()
+             with times_up_placeholder.container():
+                st.warning("⏰ Time's up for this phase!")
+             pause(1.5)
+             times_up_placeholder.empty()
 
-        # --- Timer Logic ---
-        if session.phase_start: # Ensure phase has started before calculating time
-             elapsed_time = elapsed(session.phase_start) # Use elapsed from timer module
-             remaining = duration - elapsed_time
 
-             if remaining <= 0:
-                 timer_placeholder.markdown("⏱️ Time remaining: **00:00**")
+             # --- Phase Transition ---
+             next_phase_index = session.phase_index + 1
+             records = st.session_state.responses
+             evaluated_object = session.current_object
+             more_phases = next_phase_index < len(PHASES)
+             # Recess before every phase after the first (index we are *moving to*)
+             recess_follows = more_phases and CATALOG.recess_sec > 0
+             new_object = more_phases and PHASES[next_phase_index]["object_slot"] != phase_info["object_slot"]
 
-                 times_up_placeholder = st.empty()
-                 with times_up_placeholder.container():
-                    st.warning("⏰ Time's up for this phase!")
-                 time.sleep(1.5)
-                 times_up_placeholder.empty()
+            # --- Evaluate at phase end ---
+            # Before a recess the evaluation runs in the background during the
+            # break (see prefetch_next_phase); the last phase evaluates inline.
+             if records and not recess_follows:
+                # Store disqualified texts separately for easy UI
+                st.session_state.disqualified = apply_evaluation(
+                    records, evaluate_responses(evaluated_object, records))
 
+             # Clear responses before a phase on a different object
+             if new_object:
+                 if st.session_state.responses != []:
+                    st.session_state.responses = []
+                    st.session_state.disqualified = [] # Also clear disqualified list
 
-                # --- Evaluate at phase end ---
-                 if st.session_state.responses:
-                    eval_result = evaluate_responses(session.current_object, st.session_state.responses)
-                    print(eval_result)
-                    # Mark responses based on final batch disqualification
-                    for r in st.session_state.responses:
-                        if r["use_text"] in eval_result.get("disqualified", []):
-                            r["category"] = "Disqualified"
 
-                    # Store disqualified texts separately for easy UI
-                    st.session_state.disqualified = [r["use_text"] for r in st.session_state.responses if r["category"] == "Disqualified"]
-
-
-
-
-                 # --- Phase Transition ---
-                 next_phase_index = session.phase_index + 1
-                 #st.write("🔍 DEBUG › responses =", responses)  
-                 # Clear responses before starting the *last* phase
-                 if next_phase_index == last_phase_index:
-                     if st.session_state.responses != []:
-                        st.session_state.responses = []
-                        st.session_state.disqualified = [] # Also clear disqualified list
-                        disqualified = st.session_state.get("disqualified", [])   
-                     
-
-                 session.next_phase() # This increments phase_index
-
-                 # Trigger recess between phases 0->1 and 1->2
-                 # Check the index we are *moving to*
-                 if next_phase_index in [1, 2] and next_phase_index < len(PHASES):
-                      st.session_state.recess_mode = True
-
-                 # Start the next phase (timer, etc.) - SessionState needs start_phase called explicitly
-                 if next_phase_index < len(PHASES):
-                      session.start_phase() # Reset timer and trial count for the new phase
-
-                 st.rerun() # Rerun to show recess or next phase/completion screen
-             else:
-                 # Update timer display smoothly using a loop within the script run
-                 # This avoids rerunning the entire script every second
-                 update_interval = 0.5 # How often to update the display (in seconds)
-                 display_secs = -1 # Force initial display update
-
-                 while remaining > 0:
-                     current_secs = int(remaining)
-                     if current_secs != display_secs: # Only update markdown when seconds change
-                          mins, secs = divmod(current_secs, 60)
-                          timer_placeholder.markdown(f"⏱️ Time remaining: **{mins:02d}:{secs:02d}**")
-                          display_secs = current_secs
-
-                     time.sleep(update_interval)
-                     elapsed_time = elapsed(session.phase_start)
-                     remaining = duration - elapsed_time
-
-                     # Check if form was submitted during sleep (Streamlit doesn't easily support this check here)
-                     # A full rerun handles submissions correctly. This loop is just for smooth timer display.
-                     # If precise sub-second accuracy linked to submission is needed, this approach might need adjustment.
-
-                 # Ensure timer shows 00:00 when loop finishes due to time running out
-                 timer_placeholder.markdown("⏱️ Time remaining: **00:00**")
-                 st.rerun() # Rerun to trigger the phase transition logic above
-        else:
-             # Should not happen if start_phase is called correctly, but good failsafe
-             st.warning("Waiting for phase to start...")
-             time.sleep(1)
-             st.rerun()
+             session.next_phase() # This increments phase_index
 
+             # Start the next phase (timer, etc.) - SessionState needs start_phase called explicitly.
+             # After a recess it is started when the recess ends instead.
+             if more_phases and not recess_follows:
+                  session.start_phase() # Reset timer and trial count for the new phase
 
+             # Trigger recess and prefetch the next phase's cold paths
+             if recess_follows:
+                  st.session_state.recess_mode = True
+                  prefetch_next_phase(records, evaluated_object)
 
+             st.rerun() # Rerun to show recess or next phase/completion screen
 
 
+        st.subheader(f"{phase_info['name'].title()}: ")
+        st.header(f"★★★  {obj.upper()}  ★★★")
+        st.markdown(f"**Participant:** `{participant or 'TEST'}` | **Group:** `{group_id}` | **Phase:** `{session.phase_index + 1}/{len(PHASES)}`")
 
+        # Each panel is a fragment: the timer ticks, hints and submissions
+        # rerun on their own without re-executing the rest of the page.
+        timer_panel(duration)
+        hint_panel()
+        submission_panel(obj, phase_info)
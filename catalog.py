@@ -0,0 +1,166 @@
+"""
+catalog.py – Study definition loader for the AUT Flexibility app.
+
+The study (phases, objects with their categories / suggestions /
+synonyms, and the counterbalancing schedule) lives in a JSON definition
+file.  It is parsed once per process into an immutable Catalog; each
+object's lookup structures (pre-normalized category set, suggestion
+index, prompt fragment) are compiled on first use and then shared, so
+adding objects adds no per-rerun or per-submission cost.
+
+Groups are generated from the schedule: every object order produced by
+the counterbalancing scheme × every hint condition.  With the shipped
+study.json this reproduces the original four groups:
+    0: brick → newspaper, hints     1: brick → newspaper, no hints
+    2: newspaper → brick, hints     3: newspaper → brick, no hints
+"""
+
+import os
+import json
+import zlib
+import threading
+import itertools
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple, Tuple, FrozenSet, Mapping
+
+STUDY_FILE = os.environ.get(
+    "AUT_STUDY_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "study.json"))
+
+
+def normalize_category(cat) -> str:
+    return cat.strip().lower() if isinstance(cat, str) else ""
+
+
+class ObjectSpec(NamedTuple):
+    name: str
+    categories: Tuple[str, ...]
+    category_norms: FrozenSet[str]
+    suggestions: Tuple[Tuple[str, str], ...]      # (display name, normalized)
+    synonyms: Mapping[str, Tuple[str, ...]]       # category → extra phrases
+    prompt_fragment: str                          # category list for LLM prompts
+
+
+class Group(NamedTuple):
+    group_id: int
+    objects: Tuple[str, ...]    # object per slot
+    hints: bool
+
+
+class Catalog:
+    def __init__(self, definition: dict):
+        self._raw_objects = definition["objects"]
+        self._objects = {}
+        self._lock = threading.Lock()
+        for name, raw in self._raw_objects.items():   # cheap checks now, compile later
+            _check_object(name, raw)
+        self.recess_sec = definition.get("recess_sec", 20)
+        for i, phase in enumerate(definition["phases"]):
+            missing = {"name", "duration_sec", "object_slot"} - set(phase)
+            if missing:
+                raise ValueError(f"phase {i}: missing {sorted(missing)}")
+        self.phases = tuple(
+            MappingProxyType({"hints": False, **phase}) for phase in definition["phases"])
+        self.slots = 1 + max(p["object_slot"] for p in self.phases)
+        self.groups = self._build_groups(definition["schedule"])
+        self.categories = _ObjectView(self, "categories")
+        self.suggestions = _ObjectView(self, "suggestions")
+
+    # ----------------------------------------------------------------
+    # Objects (compiled lazily)
+    # ----------------------------------------------------------------
+    @property
+    def object_names(self) -> Tuple[str, ...]:
+        return tuple(self._raw_objects)
+
+    def object(self, name: str) -> ObjectSpec:
+        spec = self._objects.get(name)
+        if spec is None:
+            with self._lock:
+                spec = self._objects.get(name) or self._compile(name)
+                self._objects[name] = spec
+        return spec
+
+    def _compile(self, name: str) -> ObjectSpec:
+        raw = self._raw_objects[name]
+        categories = tuple(raw["categories"])
+        suggestions = tuple(raw.get("suggestions", categories))
+        return ObjectSpec(
+            name=name,
+            categories=categories,
+            category_norms=frozenset(normalize_category(c) for c in categories),
+            suggestions=tuple((s, normalize_category(s)) for s in suggestions),
+            synonyms=MappingProxyType(
+                {cat: tuple(words) for cat, words in raw.get("synonyms", {}).items()}),
+            prompt_fragment=str(list(categories)),
+        )
+
+    # ----------------------------------------------------------------
+    # Schedule
+    # ----------------------------------------------------------------
+    def assign_group(self, participant: str) -> int:
+        """Stable group for a participant ID (same group after a reconnect or restart)."""
+        return zlib.crc32(participant.encode("utf-8")) % len(self.groups)
+
+    def _build_groups(self, schedule: dict) -> Tuple[Group, ...]:
+        pool = schedule["object_pool"]
+        unknown = set(pool) - set(self._raw_objects)
+        if unknown:
+            raise ValueError(f"object_pool names undefined objects: {sorted(unknown)}")
+        if len(pool) < self.slots:
+            raise ValueError(f"{self.slots} object slots but only {len(pool)} objects in the pool")
+
+        scheme = schedule.get("counterbalance", "rotation")
+        if scheme == "rotation":       # Latin-square style: one order per starting object
+            orders = [tuple((pool[i:] + pool[:i])[: self.slots]) for i in range(len(pool))]
+        elif scheme == "permutations":
+            orders = list(itertools.permutations(pool, self.slots))
+        else:
+            raise ValueError(f"unknown counterbalance scheme: {scheme!r}")
+
+        conditions = schedule.get("hint_conditions", [True])
+        return tuple(
+            Group(i, order, bool(hints))
+            for i, (order, hints) in enumerate(itertools.product(orders, conditions)))
+
+
+def _check_object(name: str, raw: dict):
+    """Schema checks that must fail at startup, not mid-study."""
+    categories = raw.get("categories")
+    if not categories or not all(isinstance(c, str) for c in categories):
+        raise ValueError(f"{name}: 'categories' must be a non-empty list of strings")
+    unknown = set(raw.get("suggestions", ())) - set(categories)
+    if unknown:
+        raise ValueError(f"{name}: suggestions not in categories: {sorted(unknown)}")
+    unknown = set(raw.get("synonyms", {})) - set(categories)
+    if unknown:
+        raise ValueError(f"{name}: synonyms for unknown categories: {sorted(unknown)}")
+
+
+class _ObjectView(Mapping):
+    """Read-only name → categories/suggestions mapping that compiles lazily."""
+
+    def __init__(self, catalog: Catalog, field: str):
+        self._catalog = catalog
+        self._field = field
+
+    def __getitem__(self, name):
+        if name not in self._catalog._raw_objects:
+            raise KeyError(name)
+        spec = self._catalog.object(name)
+        if self._field == "suggestions":
+            return [s for s, _ in spec.suggestions]
+        return list(spec.categories)
+
+    def __iter__(self):
+        return iter(self._catalog.object_names)
+
+    def __len__(self):
+        return len(self._catalog.object_names)
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path: str = None) -> Catalog:
+    """Parse and validate a study definition once per process."""
+    with open(path or STUDY_FILE, encoding="utf-8") as f:
+        return Catalog(json.load(f))
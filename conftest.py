@@ -0,0 +1,5 @@
+# Makes the app modules importable from tests/ and lets llm_client build
+# its (unused) OpenAI client without a real key.
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -2,79 +2,14 @@ import random
 import streamlit as st
 
 from timer import start_timer, elapsed
+from catalog import load_catalog, normalize_category
 
-PHASES = [
-    {"name": "First Round: Uses for Object", "duration_sec": 120},
-    {"name": "Keep Going: More Ideas for the Same Object", "duration_sec": 80},
-    {"name": "Final Round: Uses for a Different Object", "duration_sec": 140},
-]
-CATEGORY_LIST = {
-    "brick": [
-        "Building/Construction",
-        "Weapon/Defense",
-        "Paperweight",
-        "Doorstop",
-        "Landscaping/Gardening",
-        "Decoration",
-        "Exercise/Weight",
-        "Furniture Support/Leveling",
-        "Cooking/Heating",
-        "Breaking/Smashing",
-        "Pathway/Walkway",
-        "Anchoring/Weighting Down",
-        "Toy/Play",
-        "Tool/Utility",
-        "Art Installation"
-    ],
-    "newspaper": [
-        "Insect Control",
-        "Art and Craft",
-        "Cleaning",
-        "Decorations",
-        "Wrapping/Packaging",
-        "Fire-related Use",
-        "Pet-related Use",
-        "Reading/Writing",
-        "Games/Entertainment",
-        "Clothing",
-        "Sculpturing",
-        "Dog Care",
-        "Origami",
-        "Paper Plane",
-        "Miscellaneous"
-    ]
-}
-
-SUGGESTION_LIST = {
-    "brick": [
-        "Building/Construction",
-        "Weapon/Defense",
-        "Landscaping/Gardening",
-        "Decoration",
-        "Exercise/Weight",
-        "Furniture Support/Leveling",
-        "Cooking/Heating",
-        "Breaking/Smashing",
-        "Pathway/Walkway",
-        "Anchoring/Weighting Down",
-        "Toy/Play",
-        "Art Installation"
-    ],
-    "newspaper": [
-        "Insect Control",
-        "Art and Craft",
-        "Cleaning",
-        "Decorations",
-        "Wrapping/Packaging",
-        "Fire-related Use",
-        "Pet-related Use",
-        "Reading/Writing",
-        "Games/Entertainment",
-        "Clothing",
-        "Sculpturing",
-        "Dog Care"
-    ]
-}
+# Compiled once per process from study.json (see catalog.py); the module
+# names below are kept for existing imports.
+CATALOG = load_catalog()
+PHASES = CATALOG.phases
+CATEGORY_LIST = CATALOG.categories      # object → categories, compiled lazily
+SUGGESTION_LIST = CATALOG.suggestions   # object → hint suggestions
 
 
 class SessionState:
@@ -93,23 +28,28 @@ class SessionState:
 
     @property
     def current_object(self):
-        return self.objects[0] if self.phase_index < 2 else self.objects[1]
+        return self.objects[self.current_phase["object_slot"]]
 
     def start_phase(self):
         self.phase_start = start_timer()
-        # Clear used_categories only at start of Phase 0 or Phase 2
-        if self.phase_index in [0, 2]:
+        # Clear used_categories whenever a phase starts on a new object
+        if self.phase_index == 0 or PHASES[self.phase_index - 1]["object_slot"] != self.current_phase["object_slot"]:
             self.used_categories = set()
 
     def next_phase(self):
         self.phase_index += 1
 
+    def release(self):
+        """Drop per-participant state once the session is finished."""
+        self.used_categories = set()
+
     def normalize(self, cat):
-        return cat.strip().lower() if isinstance(cat, str) else ""
+        return normalize_category(cat)
 
     def record_use(self, use_text):
-        from llm_client import map_to_category
-        category = map_to_category(use_text, self.current_object, str(CATEGORY_LIST))
+        from pre_classifier import classify_with_source
+        category, source, confidence = classify_with_source(
+            use_text, self.current_object, CATALOG.object(self.current_object).prompt_fragment)
         norm_cat = self.normalize(category)
     
         # Debug log
@@ -126,6 +66,8 @@ class SessionState:
             "trial": self.trial_count,
             "use_text": use_text,
             "category": category,
+            "category_source": source,
+            "category_confidence": confidence,
             "response_time_sec": elapsed(self.phase_start)
         }
 
@@ -135,11 +77,11 @@ class SessionState:
         #st.write("Suggestions (raw):", SUGGESTION_LIST[self.current_object])
        
 
-        if not self.hints or self.phase_index != 1:
+        if not self.hints or not self.current_phase["hints"]:
             return []
         remaining = [
-            c for c in SUGGESTION_LIST[self.current_object]
-            if self.normalize(c) not in self.used_categories
+            c for c, norm in CATALOG.object(self.current_object).suggestions
+            if norm not in self.used_categories
         ]
 
         #st.write("Remaining hints:", remaining)
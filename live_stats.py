@@ -0,0 +1,123 @@
+"""
+live_stats.py – Incremental study aggregates for the researcher monitor.
+
+LiveStats is fed the same entries that app.py passes to async_log, plus
+LLM timings from usage_ledger and logging-queue events.  Each update is
+O(1); a background thread writes a small JSON snapshot every
+SNAPSHOT_INTERVAL_SEC, and monitor.py renders that snapshot, so refresh
+cost does not depend on how many rows have been collected and the
+monitor never touches the Google Sheet.  Who is active where comes from
+the session registry (added with add_source), not from recent entries,
+so participants reading instructions or in a recess are counted too.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from collections import Counter, defaultdict, deque
+
+from usage_ledger import percentile
+
+SNAPSHOT_FILE = "live_stats.json"
+SNAPSHOT_INTERVAL_SEC = 2.0
+RATE_WINDOW_MIN = 60            # minutes of submissions-per-minute history
+LATENCY_WINDOW = 500            # recent LLM calls kept per call type
+
+
+class LiveStats:
+    def __init__(self, path: str = None):
+        self.path = path or SNAPSHOT_FILE
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.total = 0
+        self._per_minute = deque(maxlen=RATE_WINDOW_MIN)   # [minute, count]
+        self._categories = defaultdict(Counter)  # object → category → count
+        self._latency = defaultdict(lambda: deque(maxlen=LATENCY_WINDOW))
+        self._log_backlog = 0
+        self._extra = {}                         # name → zero-arg callable merged into snapshots
+        self._writer = None
+
+    # ----------------------------------------------------------------
+    # Feeds
+    # ----------------------------------------------------------------
+    def add_entry(self, entry: dict):
+        """Fold in one logger entry."""
+        now = time.time()
+        minute = int(now // 60)
+        with self._lock:
+            self.total += 1
+            if self._per_minute and self._per_minute[-1][0] == minute:
+                self._per_minute[-1][1] += 1
+            else:
+                self._per_minute.append([minute, 1])
+            self._categories[entry.get("object", "")][entry.get("category", "")] += 1
+
+    def add_llm_call(self, row: dict):
+        """usage_ledger listener: keep recent latencies per call type."""
+        with self._lock:
+            self._latency[row["call_type"]].append(row["latency_sec"])
+
+    def log_queued(self):
+        with self._lock:
+            self._log_backlog += 1
+
+    def log_done(self):
+        with self._lock:
+            self._log_backlog -= 1
+
+    def add_source(self, name: str, fn):
+        """Include fn() (e.g. session registry stats) in every snapshot."""
+        self._extra[name] = fn
+
+    # ----------------------------------------------------------------
+    # Snapshot
+    # ----------------------------------------------------------------
+    def snapshot(self) -> dict:
+        now = time.time()
+        with self._lock:
+            snap = {
+                "generated": now,
+                "uptime_sec": now - self.started,
+                "total_submissions": self.total,
+                "submissions_per_minute": [list(m) for m in self._per_minute],
+                "categories": {obj: dict(c) for obj, c in self._categories.items()},
+                "llm_latency": {
+                    call: {"n": len(lat), "p50": percentile(lat, 50), "p95": percentile(lat, 95)}
+                    for call, lat in self._latency.items()
+                },
+                "log_backlog": self._log_backlog,
+            }
+        for name, fn in list(self._extra.items()):
+            try:
+                snap[name] = fn()
+            except Exception as e:
+                snap[name] = {"error": str(e)}
+        return snap
+
+    def write_snapshot(self):
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, self.path)          # readers never see a partial file
+
+    def start(self):
+        """Write snapshots in the background every SNAPSHOT_INTERVAL_SEC."""
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="live-stats", daemon=True)
+            self._writer.start()
+        return self
+
+    def _write_loop(self):
+        while True:
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                print("Live stats snapshot failed:", e, file=sys.stderr)
+            time.sleep(SNAPSHOT_INTERVAL_SEC)
+
+
+def load_snapshot(path: str = None) -> dict:
+    with open(path or SNAPSHOT_FILE, encoding="utf-8") as f:
+        return json.load(f)
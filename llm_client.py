@@ -2,14 +2,47 @@
 
 import os
 import json
+import time
 from typing import List, Dict, Any
 from openai import OpenAI   # ← new import
 from dotenv import load_dotenv
+import usage_ledger
 load_dotenv()  # loads .env vars into the environment
 
 # Create one reusable client; picks up OPENAI_API_KEY from the env
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+MODEL = "gpt-4.1-mini"
+
+# ---------------------------------------------------------------------------
+
+def _chat(call_type: str, messages: List[Dict[str, str]]) -> str:
+    """Run one chat completion and record its usage/latency in the ledger."""
+    t0 = time.perf_counter()
+    try:
+        raw = client.chat.completions.with_raw_response.create(
+            model=MODEL,
+            messages=messages,
+            temperature=0,
+            top_p=0
+        )
+        resp = raw.parse()
+    except Exception:
+        usage_ledger.record(call_type, MODEL, time.perf_counter() - t0, "error")
+        raise
+    usage_ledger.record(
+        call_type, resp.model, time.perf_counter() - t0, "ok",
+        usage=resp.usage, retries=raw.retries_taken,
+    )
+    return resp.choices[0].message.content
+
+def warm_up():
+    """Open the HTTP connection (DNS, TLS) before the next phase's first call."""
+    try:
+        client.with_options(timeout=5.0, max_retries=0).models.retrieve(MODEL)
+    except Exception as e:
+        print("LLM warm-up failed:", e)
+
 # ---------------------------------------------------------------------------
 
 def map_to_category(use_text: str, object_name: str, cats: str) -> str:
@@ -46,22 +79,17 @@ def map_to_category(use_text: str, object_name: str, cats: str) -> str:
 
 
     try:
-        resp = client.chat.completions.create(      # ← new call style
-            model="gpt-4.1-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You categorize uses of objects into creativity related "
-                        "categories."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0,
-            top_p=0
-        )
-        return resp.choices[0].message.content.strip()
+        content = _chat("map_to_category", [
+            {
+                "role": "system",
+                "content": (
+                    "You categorize uses of objects into creativity related "
+                    "categories."
+                ),
+            },
+            {"role": "user", "content": prompt},
+        ])
+        return content.strip()
     except Exception:
         return "Uncategorized"
 
@@ -97,22 +125,17 @@ Responses:
 """.strip()
 
     try:
-        resp = client.chat.completions.create(
-            model="gpt-4.1-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert in categorizing creative responses "
-                        "and spotting invalid inputs."
-                    ),
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0,
-            top_p=0
-        )
-        return json.loads(resp.choices[0].message.content)
+        content = _chat("evaluate_responses", [
+            {
+                "role": "system",
+                "content": (
+                    "You are an expert in categorizing creative responses "
+                    "and spotting invalid inputs."
+                ),
+            },
+            {"role": "user", "content": prompt},
+        ])
+        return json.loads(content)
     except Exception as e:
         print("Evaluation error:", e)
         return {"disqualified": [], "used_categories": []}
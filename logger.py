@@ -10,6 +10,7 @@ import os
 import csv
 import json
 import time
+import threading
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import streamlit as st
@@ -37,7 +38,9 @@ FIELDNAMES = [
     "response_time_sec_phase",
     "hints_enabled_group",
     "shown_hints",
-
+    # Added later – always append new columns so existing rows stay aligned
+    "category_source",         # "local" (pre_classifier) or "llm"
+    "category_confidence",     # pre_classifier score for local labels
 ]
 
 # --------------------------------------------------------------------
@@ -68,12 +71,17 @@ def _init_sheet():
 def _ensure_header(sheet):
     """
     Make sure the first row contains exactly FIELDNAMES without blanks.
-    Call once at startup; harmless if the header already exists.
+    Call once at startup; harmless if the header already exists.  Only a
+    header that FIELDNAMES extends (columns appended) is replaced, so rows
+    already in the sheet keep lining up with their column names.
     """
     try:
         current = sheet.row_values(1)
         if current != FIELDNAMES:
-            sheet.delete_rows(1) if current else None  # remove partial header
+            if current and current != FIELDNAMES[: len(current)]:
+                st.warning("Sheet header does not match FIELDNAMES; leaving it unchanged.")
+                return
+            sheet.delete_rows(1) if current else None  # remove old header
             sheet.insert_row(FIELDNAMES, 1)
             if VERBOSE:
                 st.info("Header row refreshed.")
@@ -82,6 +90,24 @@ def _ensure_header(sheet):
         if VERBOSE:
             st.exception(e)
 
+_sheet = None                      # cached worksheet; reconnects after a failed write
+_sheet_lock = threading.Lock()
+
+
+def _get_sheet():
+    """Return the cached worksheet, connecting (auth + header check) on first use."""
+    global _sheet
+    with _sheet_lock:
+        if _sheet is None:
+            _sheet = _init_sheet()
+        return _sheet
+
+
+def warm_up():
+    """Connect to Google Sheets ahead of the next write (e.g. during a recess)."""
+    if USE_SHEETS:
+        _get_sheet()
+
 # --------------------------------------------------------------------
 # Helpers
 # --------------------------------------------------------------------
@@ -102,8 +128,9 @@ def log(entry: dict):
     """
     entry.setdefault("timestamp", time.strftime("%Y-%m-%d %H:%M:%S"))
 
+    global _sheet
     if USE_SHEETS:
-        sheet = _init_sheet()
+        sheet = _get_sheet()
         if sheet:
             try:
                 row = _build_row(entry)
@@ -116,6 +143,7 @@ def log(entry: dict):
                     st.success("Logged to Google Sheets")
                 return
             except Exception as e:
+                _sheet = None  # reconnect on the next write
                 st.error("Failed to write to Google Sheets.")
                 st.exception(e)
                 # intentional fall‑through to CSV backup
@@ -130,9 +158,47 @@ def log(entry: dict):
 # --------------------------------------------------------------------
 # CSV backup
 # --------------------------------------------------------------------
+_csv_checked = False
+_csv_lock = threading.Lock()
+
+
+def _upgrade_csv_header():
+    """
+    Bring an existing CSV backup in line with FIELDNAMES, once per process.
+
+    • Old header is a prefix of FIELDNAMES (columns were appended):
+      rewrite the file with the new header, padding old rows with blanks.
+    • Any other layout: rotate it to responses.<timestamp>.csv so rows of
+      different widths never share one header.
+    """
+    global _csv_checked
+    with _csv_lock:
+        if _csv_checked:
+            return
+        _csv_checked = True
+        if not os.path.exists(LOGFILE):
+            return
+        with open(LOGFILE, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        header = rows[0] if rows else []
+        if header == FIELDNAMES:
+            return
+        if header and header == FIELDNAMES[: len(header)]:
+            tmp = LOGFILE + ".tmp"
+            with open(tmp, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(FIELDNAMES)
+                writer.writerows(r + [""] * (len(FIELDNAMES) - len(r)) for r in rows[1:])
+            os.replace(tmp, LOGFILE)
+        else:
+            base, ext = os.path.splitext(LOGFILE)
+            os.replace(LOGFILE, f"{base}.{time.strftime('%Y%m%d-%H%M%S')}{ext}")
+
+
 def _log_to_csv(entry: dict):
     """Write the entry to a local CSV file (creates header row if needed)."""
     try:
+        _upgrade_csv_header()
         file_exists = os.path.exists(LOGFILE)
         with open(LOGFILE, "a", newline="", encoding="utf-8") as f:
             writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
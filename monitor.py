@@ -0,0 +1,85 @@
+# aut-flexibility-app/monitor.py
+#
+# Researcher dashboard: run next to the study app with
+#     streamlit run monitor.py --server.port 8502
+# It only reads the snapshot that app.py's LiveStats writes, so it never
+# competes with logger.log for Google Sheets quota.
+
+import time
+
+import pandas as pd
+import streamlit as st
+
+from live_stats import load_snapshot, SNAPSHOT_FILE, SNAPSHOT_INTERVAL_SEC
+
+st.set_page_config(page_title="AUT study monitor", layout="wide")
+st.title("AUT Flexibility Study – live monitor")
+
+
+@st.fragment(run_every=SNAPSHOT_INTERVAL_SEC)
+def dashboard():
+    try:
+        snap = load_snapshot()
+    except FileNotFoundError:
+        st.info(f"No snapshot yet at `{SNAPSHOT_FILE}` – is the study app running?")
+        return
+
+    age = time.time() - snap["generated"]
+    if age > 5 * SNAPSHOT_INTERVAL_SEC:
+        st.warning(f"Snapshot is {age:.0f} s old – the study app may have stopped.")
+
+    per_minute = snap["submissions_per_minute"]
+    now_minute = int(snap["generated"] // 60)
+    last_minute = per_minute[-1][1] if per_minute and per_minute[-1][0] == now_minute else 0
+    sessions = snap.get("sessions") or {}
+    has_sessions = "sessions" in sessions
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Active participants", sessions["sessions"]["active"] if has_sessions else "–")
+    c2.metric("Submissions (total)", snap["total_submissions"])
+    c3.metric("Submissions this minute", last_minute)
+    c4.metric("Logging backlog", snap["log_backlog"])
+
+    left, right = st.columns(2)
+    with left:
+        st.subheader("Active participants by phase / group")
+        active = sessions.get("active_by_phase_group")
+        if active:
+            rows = [(*key.split("|"), n) for key, n in active.items()]
+            df = pd.DataFrame(rows, columns=["phase", "group", "participants"])
+            st.dataframe(df.pivot_table(index="phase", columns="group", values="participants",
+                                        fill_value=0))
+        else:
+            st.caption("No active sessions.")
+
+        st.subheader("Submissions per minute")
+        if per_minute:
+            df = pd.DataFrame(per_minute, columns=["minute", "submissions"])
+            df["minute"] = pd.to_datetime(df["minute"] * 60, unit="s")
+            st.bar_chart(df, x="minute", y="submissions")
+
+    with right:
+        st.subheader("LLM latency (recent calls)")
+        latency = snap["llm_latency"]
+        if latency:
+            st.dataframe(pd.DataFrame(latency).T)
+
+        if has_sessions:
+            st.subheader("Sessions on this server")
+            s1, s2, s3, s4 = st.columns(4)
+            s1.metric("Active", sessions["sessions"]["active"])
+            s2.metric("Completed", sessions["sessions"]["completed"])
+            s3.metric("Abandoned", sessions["sessions"]["abandoned"])
+            s4.metric("Mean footprint", f"{sessions['footprint_mean'] / 1024:.0f} KiB")
+
+    st.subheader("Category distribution per object")
+    categories = snap["categories"]
+    for col, (obj, counts) in zip(st.columns(max(1, len(categories))), sorted(categories.items())):
+        with col:
+            st.markdown(f"**{obj or '–'}**")
+            st.bar_chart(pd.Series(counts, name="uses").sort_values(ascending=False))
+
+    st.caption(f"Snapshot age {age:.1f} s · server uptime {snap['uptime_sec'] / 3600:.1f} h")
+
+
+dashboard()
@@ -0,0 +1,298 @@
+"""
+originality_index.py – Per-object originality index over all participants' uses.
+
+Each normalized use is embedded as a character-trigram vector hashed into
+DIM buckets (crc32, stable across processes) and L2-normalized, so cosine
+similarity is a plain dot product.  Vectors for one object live in a
+growable memory-mapped .npy matrix next to a text file holding the
+normalized uses, one per line; both are appended to as rows are logged.
+
+Originality of a use = share of the object's indexed responses that are
+NOT near-duplicates of it (cosine ≥ threshold; a use already in the index
+matches itself).  Queries are batched matrix products over fixed-size
+query × row blocks, so scoring a full archive is a series of BLAS calls
+with bounded memory rather than a quadratic string comparison.
+
+Build from / score the logger's CSV backup:
+
+    python originality_index.py build responses.csv [directory]
+    python originality_index.py score responses.csv [directory] > originality.csv
+
+Writers (the running app, build) hold an exclusive lock on the index
+directory, so build refuses to append to files a live server has
+memory-mapped; stop the app or build into another directory and swap it
+in while the app is down.  score only reads and takes no lock.
+"""
+
+import os
+import re
+import sys
+import csv
+import zlib
+import threading
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:             # Windows
+    fcntl = None
+    import msvcrt
+
+INDEX_DIR = "originality_index"
+DIM = 256                       # hashed trigram buckets per vector
+NGRAM = 3
+SIMILARITY_THRESHOLD = 0.8      # cosine at/above which two uses count as the same idea
+BLOCK_ROWS = 16384              # index rows per matrix-product block
+QUERY_ROWS = 1024               # queries per matrix-product block
+INITIAL_CAPACITY = 1024
+LOCK_FILE = ".lock"
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_use(text: str) -> str:
+    return _NON_WORD.sub(" ", str(text).lower()).strip()
+
+
+def vectorize(texts, dim: int = DIM) -> np.ndarray:
+    """Hashed, L2-normalized character n-gram vectors, one row per text."""
+    rows, cols = [], []
+    for i, text in enumerate(texts):
+        s = f" {normalize_use(text)} "
+        for j in range(len(s) - NGRAM + 1):
+            rows.append(i)
+            cols.append(zlib.crc32(s[j:j + NGRAM].encode()) % dim)
+    out = np.zeros((len(texts), dim), dtype=np.float32)
+    np.add.at(out, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+    norms = np.linalg.norm(out, axis=1, keepdims=True)
+    np.divide(out, norms, out=out, where=norms > 0)
+    return out
+
+
+class ObjectIndex:
+    """Append-only vector index of one object's normalized uses."""
+
+    def __init__(self, object_name: str, directory: str = None, dim: int = DIM):
+        directory = directory or INDEX_DIR
+        os.makedirs(directory, exist_ok=True)
+        self.object_name = object_name
+        self.dim = dim
+        self._lock = threading.RLock()
+        base = os.path.join(directory, normalize_use(object_name).replace(" ", "_"))
+        self._matrix_path = base + ".npy"
+        self._text_path = base + ".txt"
+
+        if os.path.exists(self._text_path):
+            with open(self._text_path, encoding="utf-8") as f:
+                self.texts = f.read().splitlines()
+        else:
+            self.texts = []
+        if os.path.exists(self._matrix_path):
+            self._matrix = np.load(self._matrix_path, mmap_mode="r+")
+            if self._matrix.shape[1] != dim:
+                raise ValueError(f"{self._matrix_path} has dim {self._matrix.shape[1]}, expected {dim}")
+            # add() flushes vectors before texts, so rows past len(texts) are
+            # at worst orphaned vectors; they are ignored and overwritten.
+        else:
+            self._matrix = self._allocate(max(INITIAL_CAPACITY, len(self.texts)))
+            self._matrix[: len(self.texts)] = vectorize(self.texts, dim)
+        self._texts_file = open(self._text_path, "a", encoding="utf-8")
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _allocate(self, capacity: int, path: str = None) -> np.ndarray:
+        return np.lib.format.open_memmap(
+            path or self._matrix_path, mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+
+    def _grow(self, needed: int):
+        """Copy into a larger file beside the old one and swap it in atomically,
+        so a crash mid-grow leaves the old vectors intact."""
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        tmp = self._matrix_path + ".tmp"
+        grown = self._allocate(max(needed, capacity * 2), tmp)
+        grown[: len(self)] = self._matrix[: len(self)]
+        grown.flush()
+        del grown
+        self._matrix = None          # unmap before the file is replaced
+        os.replace(tmp, self._matrix_path)
+        self._matrix = np.load(self._matrix_path, mmap_mode="r+")
+
+    def add(self, uses):
+        """Insert a batch of raw uses (vectorized once, appended to disk)."""
+        norm = [normalize_use(u) for u in uses]
+        norm = [u for u in norm if u]
+        if not norm:
+            return
+        vectors = vectorize(norm, self.dim)
+        with self._lock:
+            n = len(self)
+            self._grow(n + len(norm))
+            self._matrix[n: n + len(norm)] = vectors
+            self._matrix.flush()
+            self._texts_file.writelines(u + "\n" for u in norm)
+            self._texts_file.flush()
+            self.texts.extend(norm)
+
+    def _similarities(self, queries: np.ndarray):
+        """Yield (query offset, row offset, cosine block) over the whole index."""
+        n = len(self)
+        for q in range(0, len(queries), QUERY_ROWS):
+            chunk = queries[q: q + QUERY_ROWS]
+            for start in range(0, n, BLOCK_ROWS):
+                block = self._matrix[start: min(n, start + BLOCK_ROWS)]
+                yield q, start, chunk @ block.T
+
+    def neighbours(self, uses, k: int = 5):
+        """Top-k (indices, cosines) per use, best first."""
+        queries = vectorize(uses, self.dim)
+        k = min(k, len(self))
+        best_idx = np.zeros((len(uses), k), dtype=np.intp)
+        best_sim = np.full((len(uses), k), -np.inf, dtype=np.float32)
+        with self._lock:
+            for q, start, sims in self._similarities(queries):
+                rows = slice(q, q + len(sims))
+                kk = min(k, sims.shape[1])
+                top = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+                idx = np.concatenate([best_idx[rows], top + start], axis=1)
+                sim = np.concatenate([best_sim[rows], np.take_along_axis(sims, top, axis=1)], axis=1)
+                keep = np.argsort(-sim, axis=1)[:, :k]
+                best_idx[rows] = np.take_along_axis(idx, keep, axis=1)
+                best_sim[rows] = np.take_along_axis(sim, keep, axis=1)
+        return best_idx, best_sim
+
+    def cluster_counts(self, uses, threshold: float = SIMILARITY_THRESHOLD) -> np.ndarray:
+        """How many indexed responses are near-duplicates of each use."""
+        queries = vectorize(uses, self.dim)
+        counts = np.zeros(len(uses), dtype=np.int64)
+        with self._lock:
+            for q, _, sims in self._similarities(queries):
+                counts[q: q + len(sims)] += (sims >= threshold).sum(axis=1)
+        return counts
+
+    def originality(self, uses, threshold: float = SIMILARITY_THRESHOLD) -> np.ndarray:
+        """1 − share of indexed responses that express the same idea (0..1)."""
+        n = len(self)
+        if n == 0:
+            return np.ones(len(uses))
+        return 1.0 - self.cluster_counts(uses, threshold) / n
+
+    def clusters(self, threshold: float = SIMILARITY_THRESHOLD) -> np.ndarray:
+        """Greedy leader clustering of the whole index; returns a label per row."""
+        with self._lock:
+            matrix = np.array(self._matrix[: len(self)])
+        labels = np.full(len(matrix), -1, dtype=np.int64)
+        next_label = 0
+        for i in range(len(matrix)):
+            if labels[i] >= 0:
+                continue
+            members = (matrix[i:] @ matrix[i]) >= threshold
+            members &= labels[i:] < 0
+            labels[i:][members] = next_label
+            next_label += 1
+        return labels
+
+    def close(self):
+        with self._lock:
+            self._matrix.flush()
+            self._texts_file.close()
+
+
+class IndexInUseError(RuntimeError):
+    pass
+
+
+_locked_dirs = {}                # absolute path → open lock file (held for the process lifetime)
+
+
+def _lock_directory(directory: str):
+    """Take the directory's writer lock once per process, or raise IndexInUseError."""
+    path = os.path.abspath(directory)
+    if path in _locked_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    f = open(os.path.join(path, LOCK_FILE), "a+")
+    try:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        raise IndexInUseError(f"{path} is in use by another writer (a running app or build)") from None
+    _locked_dirs[path] = f
+
+
+class OriginalityIndex:
+    """Lazily opened ObjectIndex per object, shared by the whole process.
+
+    With writer=True (the app, build) the directory is locked against other
+    writing processes; pass writer=False for read-only use such as score."""
+
+    def __init__(self, directory: str = None, dim: int = DIM, writer: bool = True):
+        self.directory = directory or INDEX_DIR
+        self.dim = dim
+        if writer:
+            _lock_directory(self.directory)
+        self._objects = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, object_name: str) -> ObjectIndex:
+        with self._lock:
+            if object_name not in self._objects:
+                self._objects[object_name] = ObjectIndex(object_name, self.directory, self.dim)
+            return self._objects[object_name]
+
+    def add_entry(self, entry: dict):
+        """Index one logger entry (same dict passed to logger.log)."""
+        if entry.get("object") and entry.get("use_text"):
+            self[entry["object"]].add([entry["use_text"]])
+
+
+# --------------------------------------------------------------------
+# Archive tools
+# --------------------------------------------------------------------
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return [r for r in csv.DictReader(f) if r.get("object") and r.get("use_text")]
+
+
+def build(csv_path: str, directory: str = None):
+    """Index every logged use in a CSV backup (appends to an existing index).
+
+    Raises IndexInUseError if another process (e.g. the app) writes there."""
+    rows = _read_csv(csv_path)
+    index = OriginalityIndex(directory)
+    by_object = {}
+    for r in rows:
+        by_object.setdefault(r["object"], []).append(r["use_text"])
+    for obj, uses in by_object.items():
+        index[obj].add(uses)
+        print(f"{obj}: {len(index[obj])} uses indexed", file=sys.stderr)
+
+
+def score(csv_path: str, directory: str = None):
+    """Write participant, object, use and originality for every logged use."""
+    rows = _read_csv(csv_path)
+    index = OriginalityIndex(directory, writer=False)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["participant", "object", "use_text", "originality"])
+    by_object = {}
+    for r in rows:
+        by_object.setdefault(r["object"], []).append(r)
+    for obj, group in by_object.items():
+        scores = index[obj].originality([r["use_text"] for r in group])
+        for r, s in zip(group, scores):
+            writer.writerow([r["participant"], obj, r["use_text"], f"{s:.4f}"])
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("build", "score"):
+        sys.exit(__doc__)
+    try:
+        {"build": build, "score": score}[sys.argv[1]](*sys.argv[2:4])
+    except IndexInUseError as e:
+        sys.exit(f"{e}; stop the app or build into another directory.")
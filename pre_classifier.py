@@ -0,0 +1,296 @@
+"""
+pre_classifier.py – Fast local first pass in front of llm_client.map_to_category.
+
+Obvious submissions are labelled locally in microseconds; anything below
+CONFIDENCE_THRESHOLD is escalated to the LLM.  Signals, per object:
+
+    • a keyword lexicon per object, compiled on first use from the category
+      names and the synonyms in the study definition (catalog.py),
+    • character trigram similarity against category names and against
+      uses the LLM has already labelled in this process,
+    • a gibberish / object-name-repeat detector (→ "Disqualified").
+
+Every escalation also scores the local guess against the LLM label, and a
+small sample of local decisions is shadow-checked by the LLM in the
+background, so agreement_report() shows how much traffic a given threshold
+would take off the network path and how often it would disagree.
+
+Offline tuning against past LLM labels in the logger's CSV backup:
+
+    python pre_classifier.py responses.csv
+"""
+
+import re
+import sys
+import random
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import llm_client
+from catalog import load_catalog
+
+CONFIDENCE_THRESHOLD = 0.9     # local labels at or above this skip the LLM
+SHADOW_RATE = 0.05             # share of local labels re-checked by the LLM
+MAX_LEARNED = 5000             # LLM-labelled uses remembered per object
+ENABLED = True                 # set False to always ask the LLM
+MAX_ACRONYM = 4                # vowel-less words up to this length may be acronyms
+
+DISQUALIFIED = "Disqualified"
+UNCATEGORIZED = "Uncategorized"
+SOURCE_LOCAL = "local"
+SOURCE_LLM = "llm"
+
+_NON_WORD = re.compile(r"[^a-z0-9 ]+")
+_CONSONANT_RUN = re.compile(r"[bcdfghjklmnpqrstvwxz]{6,}")
+_REPEAT_RUN = re.compile(r"(.)\1{3,}")
+_VOWELS = set("aeiouy")
+_STOPWORDS = {"a", "an", "the", "to", "as", "for", "of", "on", "in", "it", "use", "with", "and", "or"}
+
+
+# --------------------------------------------------------------------
+# Normalization
+# --------------------------------------------------------------------
+def _stem(token: str) -> str:
+    for suffix in ("ing", "es", "ed", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    return token
+
+
+def _tokens(text: str) -> tuple:
+    words = _NON_WORD.sub(" ", text.lower().replace("/", " ").replace("-", " ")).split()
+    return tuple(_stem(w) for w in words if w not in _STOPWORDS)
+
+
+def _trigrams(text: str) -> frozenset:
+    s = f"  {' '.join(_tokens(text))} "
+    return frozenset(s[i:i + 3] for i in range(len(s) - 2))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+# --------------------------------------------------------------------
+# Precompiled per-object lexicon
+# --------------------------------------------------------------------
+class _ObjectLexicon:
+    def __init__(self, spec):
+        self.object_tokens = {_tokens(spec.name), _tokens(spec.name + "s")}
+        self.categories = set(spec.categories)
+        self.exact = {}                      # token tuple → category
+        self.phrases = defaultdict(set)      # first token → {(phrase, category)}
+        self.name_grams = []                 # (trigrams, category)
+        for cat in spec.categories:
+            names = re.split(r"/| and ", cat)
+            for phrase in names + list(spec.synonyms.get(cat, ())):
+                toks = _tokens(phrase)
+                if toks:
+                    self.exact.setdefault(toks, cat)
+                    self.phrases[toks[0]].add((toks, cat))
+            self.name_grams.extend((_trigrams(n), cat) for n in names)
+
+    def keyword_hits(self, toks: tuple) -> set:
+        hits = set()
+        for i, tok in enumerate(toks):
+            for phrase, cat in self.phrases.get(tok, ()):
+                if toks[i:i + len(phrase)] == phrase:
+                    hits.add(cat)
+        return hits
+
+
+_lexicons = {}
+
+
+def _lexicon(object_name: str):
+    """Compiled lexicon for an object (None for objects not in the catalog)."""
+    lex = _lexicons.get(object_name)
+    if lex is None:
+        catalog = load_catalog()
+        if object_name not in catalog.object_names:
+            return None
+        lex = _lexicons.setdefault(object_name, _ObjectLexicon(catalog.object(object_name)))
+    return lex
+
+
+def warm_up(object_name: str):
+    """Compile an object's catalog spec and lexicon ahead of its first use
+    (e.g. during the recess before a phase on a new object)."""
+    _lexicon(object_name)
+
+
+# LLM-labelled uses per object: token tuple → label, plus an inverted
+# trigram index (trigram → entry ids) so similarity lookups only touch
+# entries that share at least one trigram with the query.
+_learned = defaultdict(dict)
+_learned_entries = defaultdict(list)         # [(trigram count, label)]
+_learned_index = defaultdict(lambda: defaultdict(list))
+_learn_lock = threading.Lock()
+
+
+def _is_gibberish(text: str, toks: tuple) -> bool:
+    """Keyboard mashing / vowel-less words.  Digit tokens ("1000", "2000s")
+    and short acronyms ("html", "dvd") are left for the LLM to judge."""
+    words = re.sub(r"[^a-z]+", " ", text.lower()).split()
+    if any(_CONSONANT_RUN.search(w) or _REPEAT_RUN.search(w) for w in words):
+        return True
+    return any(t.isalpha() and len(t) > MAX_ACRONYM and not (_VOWELS & set(t)) for t in toks)
+
+
+# --------------------------------------------------------------------
+# Local classification
+# --------------------------------------------------------------------
+def predict(use_text: str, object_name: str) -> tuple:
+    """Return (label, confidence) from local signals only."""
+    lex = _lexicon(object_name)
+    if lex is None:
+        return UNCATEGORIZED, 0.0
+    toks = _tokens(use_text)
+    if not re.search(r"[a-z]", use_text.lower()) or toks in lex.object_tokens:
+        return DISQUALIFIED, 0.97
+    if _is_gibberish(use_text, toks):
+        return DISQUALIFIED, 0.7      # likely, but the LLM decides
+
+    learned = _learned[object_name].get(toks)
+    if learned:
+        return learned, 0.98
+    if toks in lex.exact:
+        return lex.exact[toks], 0.99
+
+    hits = lex.keyword_hits(toks)
+    if len(hits) == 1:                # one keyword is a hint, not a verdict
+        return next(iter(hits)), 0.8
+    if hits:
+        return sorted(hits)[0], 0.6 / len(hits)
+
+    grams = _trigrams(use_text)
+    best, score = UNCATEGORIZED, 0.0
+    for cat_grams, cat in lex.name_grams:
+        s = _jaccard(grams, cat_grams) * 0.95
+        if s > score:
+            best, score = cat, s
+    overlaps = defaultdict(int)
+    index = _learned_index[object_name]
+    for g in grams:
+        for entry in index.get(g, ()):
+            overlaps[entry] += 1
+    entries = _learned_entries[object_name]
+    for entry, shared in overlaps.items():
+        size, label = entries[entry]
+        s = shared / (len(grams) + size - shared)
+        if s > score:
+            best, score = label, s
+    return best, round(score, 3)
+
+
+def learn(use_text: str, object_name: str, label: str):
+    """Remember an LLM label so repeats and near-repeats resolve locally."""
+    lex = _lexicon(object_name)
+    if lex is None or (label not in lex.categories and label != DISQUALIFIED):
+        return
+    toks = _tokens(use_text)
+    with _learn_lock:
+        learned = _learned[object_name]
+        if toks in learned or len(learned) >= MAX_LEARNED:
+            return
+        learned[toks] = label
+        grams = _trigrams(use_text)
+        entries = _learned_entries[object_name]
+        entries.append((len(grams), label))   # before its id is published:
+        entry = len(entries) - 1              # predict() reads without the lock
+        for g in grams:
+            _learned_index[object_name][g].append(entry)
+
+
+# --------------------------------------------------------------------
+# Agreement tracking
+# --------------------------------------------------------------------
+_stats_lock = threading.Lock()
+_counts = {"local": 0, "escalated": 0}
+_agreement = defaultdict(lambda: [0, 0])     # confidence bucket → [agree, total]
+_shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pre-classifier-shadow")
+
+
+def _record_agreement(confidence: float, local: str, llm: str):
+    bucket = min(9, int(confidence * 10)) / 10
+    with _stats_lock:
+        pair = _agreement[bucket]
+        pair[0] += local == llm
+        pair[1] += 1
+
+
+def _shadow_check(use_text, object_name, cats, label, confidence):
+    try:
+        _record_agreement(confidence, label, llm_client.map_to_category(use_text, object_name, cats))
+    except Exception as e:
+        print("Pre-classifier shadow check failed:", e, file=sys.stderr)
+
+
+def agreement_report() -> dict:
+    """Traffic split and per-confidence-bucket agreement with the LLM."""
+    with _stats_lock:
+        total = _counts["local"] + _counts["escalated"]
+        return {
+            "local": _counts["local"],
+            "escalated": _counts["escalated"],
+            "local_share": _counts["local"] / total if total else 0.0,
+            "agreement_by_confidence": {
+                b: {"n": n, "agreement": agree / n}
+                for b, (agree, n) in sorted(_agreement.items())
+            },
+        }
+
+
+# --------------------------------------------------------------------
+# Public API
+# --------------------------------------------------------------------
+def classify_with_source(use_text: str, object_name: str, cats: str) -> tuple:
+    """Return (category, source, confidence); source is "local" or "llm",
+    confidence is the local score ("" when the label came from the LLM)."""
+    if not ENABLED:
+        return llm_client.map_to_category(use_text, object_name, cats), SOURCE_LLM, ""
+
+    label, confidence = predict(use_text, object_name)
+    if confidence >= CONFIDENCE_THRESHOLD:
+        with _stats_lock:
+            _counts["local"] += 1
+        if random.random() < SHADOW_RATE:
+            _shadow_executor.submit(_shadow_check, use_text, object_name, cats, label, confidence)
+        return label, SOURCE_LOCAL, confidence
+
+    with _stats_lock:
+        _counts["escalated"] += 1
+    category = llm_client.map_to_category(use_text, object_name, cats)
+    _record_agreement(confidence, label, category.strip())
+    learn(use_text, object_name, category.strip())
+    return category, SOURCE_LLM, ""
+
+
+def classify(use_text: str, object_name: str, cats: str) -> str:
+    """Drop-in for map_to_category: local label when confident, else the LLM."""
+    return classify_with_source(use_text, object_name, cats)[0]
+
+
+def _offline_report(path: str):
+    """Score the local classifier against LLM labels logged in a CSV backup.
+
+    Rows labelled by the pre-classifier itself are skipped; rows logged
+    before category_source existed all came from the LLM."""
+    import csv
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = [r for r in csv.DictReader(f)
+                if _lexicon(r.get("object", "")) and r.get("category_source") != SOURCE_LOCAL]
+    preds = [(predict(r["use_text"], r["object"]), r["category"].strip()) for r in rows]
+    print(f"{len(rows)} labelled uses\n")
+    print(f"{'threshold':>10}{'local share':>13}{'agreement':>11}")
+    for threshold in (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.98):
+        taken = [(label, llm) for (label, conf), llm in preds if conf >= threshold]
+        agree = sum(label == llm for label, llm in taken)
+        share = len(taken) / len(rows) if rows else 0.0
+        rate = f"{agree / len(taken):.1%}" if taken else "-"
+        print(f"{threshold:>10.2f}{share:>13.1%}{rate:>11}")
+
+
+if __name__ == "__main__":
+    _offline_report(sys.argv[1] if len(sys.argv) > 1 else "responses.csv")
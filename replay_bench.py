@@ -0,0 +1,312 @@
+"""
+replay_bench.py – Headless end-to-end replay benchmark for app.py.
+
+Drives a complete participant flow (consent, start, every phase with its
+submissions, recesses, completion) through streamlit.testing.v1.AppTest.
+Time is compressed with a virtual clock installed via timer.set_clock(),
+and the LLM and Google Sheets backends are replaced by in-process
+stand-ins.  Reports per-rerun script time, reruns per submission and
+memory growth, so UI-flow changes can be benchmarked like unit functions.
+
+Session script (JSON), timestamps in seconds since phase start:
+
+    {"participant": "P1", "phases": [[{"t": 4.2, "use": "doorstop"}, ...], ...]}
+
+Usage:
+
+    python replay_bench.py                               # one synthetic session
+    python replay_bench.py session.json                  # recorded script
+    python replay_bench.py --csv responses.csv --participant P1
+    python replay_bench.py --sessions 20 --tracemalloc   # memory over many sessions
+"""
+
+import os
+import csv
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from contextlib import ExitStack
+from collections import defaultdict
+from unittest import mock
+
+os.environ.setdefault("OPENAI_API_KEY", "replay-bench")  # no real calls are made
+
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import app_test as _app_test
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+
+import timer
+import logger
+import llm_client
+import usage_ledger
+import originality_index
+import live_stats
+from feedback_engine import PHASES, CATEGORY_LIST
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+_STOP_EVENTS = {
+    ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+    ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR,
+    ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN,
+    ScriptRunnerEvent.FRAGMENT_STOPPED_WITH_SUCCESS,
+}
+
+
+# --------------------------------------------------------------------
+# Stand-ins
+# --------------------------------------------------------------------
+class VirtualClock:
+    """Monotonic clock where sleeping just moves time forward."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeSheet:
+    """In-memory replacement for the gspread worksheet used by logger."""
+
+    def __init__(self):
+        self.rows = []
+
+    def append_row(self, row, **kwargs):
+        self.rows.append(row)
+
+
+def _fake_chat(rng, latency):
+    """Stand-in for llm_client._chat answering both call types."""
+    categories = [c for cats in CATEGORY_LIST.values() for c in cats]
+
+    def _chat(call_type, messages):
+        if latency:
+            time.sleep(latency)  # real time: simulates network wait
+        if call_type == "evaluate_responses":
+            return json.dumps({"disqualified": [], "used_categories": []})
+        return rng.choice(categories + ["Uncategorized"])
+
+    return _chat
+
+
+# --------------------------------------------------------------------
+# Rerun timing
+# --------------------------------------------------------------------
+class RerunRecorder:
+    """Times every script / fragment execution, labelled by the current step."""
+
+    def __init__(self):
+        self.step = "load"
+        self.runs = []          # (step, seconds, stop event)
+        self._started = None
+
+    def on_event(self, sender, event, **kwargs):
+        if event == ScriptRunnerEvent.SCRIPT_STARTED:
+            self._started = time.perf_counter()
+        elif event in _STOP_EVENTS and self._started is not None:
+            self.runs.append((self.step, time.perf_counter() - self._started, event))
+            self._started = None
+
+    def runner_class(self):
+        recorder = self
+
+        class _TimedScriptRunner(LocalScriptRunner):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.on_event.connect(recorder.on_event, weak=False)
+
+        return _TimedScriptRunner
+
+
+# --------------------------------------------------------------------
+# Session scripts
+# --------------------------------------------------------------------
+_VERBS = ["build", "hold", "prop", "smash", "paint", "stack", "carve", "wrap",
+          "weigh", "heat", "throw", "stand", "fold", "burn", "plant", "grind"]
+_NOUNS = ["door", "garden", "shelf", "fire", "window", "wall", "bookend", "path",
+          "sculpture", "bed", "hat", "boat", "nest", "mask", "drum", "kite"]
+
+
+def synthetic_session(rng, participant="BENCH", uses_per_phase=(14, 9, 16)):
+    """Random but plausible uses spread over each phase's duration."""
+    phases = []
+    for phase, n in zip(PHASES, uses_per_phase):
+        span = phase["duration_sec"] - 5
+        times = sorted(rng.uniform(2, span) for _ in range(n))
+        uses = rng.sample([f"{v} a {o}" for v in _VERBS for o in _NOUNS], n)
+        phases.append([{"t": round(t, 2), "use": u} for t, u in zip(times, uses)])
+    return {"participant": participant, "phases": phases}
+
+
+def session_from_csv(path, participant):
+    """Rebuild a session script from the logger's CSV backup."""
+    phases = defaultdict(list)
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row["participant"] == participant:
+                phases[int(row["phase_index"])].append(
+                    {"t": float(row["response_time_sec_phase"]), "use": row["use_text"]})
+    return {"participant": participant,
+            "phases": [phases.get(i, []) for i in range(len(PHASES))]}
+
+
+# --------------------------------------------------------------------
+# Replay
+# --------------------------------------------------------------------
+def _button(at, label):
+    return next(b for b in at.button if b.label == label)
+
+
+def replay(script, recorder, clock, timeout=60):
+    """Play one session script through app.py.
+
+    Returns (accepted, rejected): a submission counts only if the app added
+    it to the response list; runs for uses it rejected as (near-)duplicates
+    are relabelled "rejected" so they do not skew the submit timings."""
+    def step(name):
+        recorder.step = name
+        at.run(timeout=timeout)
+        if at.exception:
+            raise RuntimeError(f"app.py raised during '{name}': {at.exception[0].message}")
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.query_params["PROLIFIC_PID"] = script["participant"]
+    step("load")
+    at.checkbox[0].check()
+    step("consent")
+    _button(at, "Start").click()
+    step("start")
+
+    submissions = rejected = 0
+    for phase_uses in script["phases"]:
+        session = at.session_state["session"]
+        phase_start = session.phase_start
+        for u in sorted(phase_uses, key=lambda u: u["t"]):
+            clock.now = max(clock.now, phase_start + u["t"])
+            at.text_input[0].input(u["use"])
+            _button(at, "Submit use").click()
+            first_run, before = len(recorder.runs), len(at.session_state["responses"])
+            step("submit")
+            if len(at.session_state["responses"]) > before:
+                submissions += 1
+            else:
+                recorder.runs[first_run:] = [("rejected", *run[1:]) for run in recorder.runs[first_run:]]
+                rejected += 1
+        # Phase end, recess and the next phase's first render
+        clock.now = max(clock.now, phase_start + session.current_phase["duration_sec"])
+        step("phase_end")
+
+    if at.session_state["session"].phase_index < len(PHASES):
+        raise RuntimeError("replay finished before the study was completed")
+    return submissions, rejected
+
+
+def _pct(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def _rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def run(scripts, llm_latency=0.0, trace=False, seed=0):
+    """Replay every script in one process and print the benchmark report."""
+    recorder = RerunRecorder()
+    clock = VirtualClock()
+    workdir = tempfile.mkdtemp(prefix="replay_bench_")
+    sheet = FakeSheet()
+    memory = []             # (session #, traced MB or None, peak RSS MB)
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(_app_test, "LocalScriptRunner", recorder.runner_class()))
+        stack.enter_context(mock.patch.object(llm_client, "_chat", _fake_chat(random.Random(seed), llm_latency)))
+        stack.enter_context(mock.patch.object(llm_client, "warm_up", lambda: None))
+        stack.enter_context(mock.patch.object(logger, "_init_sheet", lambda: sheet))
+        stack.enter_context(mock.patch.object(logger, "_sheet", None))
+        stack.enter_context(mock.patch.object(logger, "LOGFILE", os.path.join(workdir, "responses.csv")))
+        stack.enter_context(mock.patch.object(usage_ledger, "LEDGERFILE", os.path.join(workdir, "llm_usage.jsonl")))
+        stack.enter_context(mock.patch.object(originality_index, "INDEX_DIR", os.path.join(workdir, "originality_index")))
+        stack.enter_context(mock.patch.object(live_stats, "SNAPSHOT_FILE", os.path.join(workdir, "live_stats.json")))
+        timer.set_clock(clock.clock, clock.sleep)
+        stack.callback(timer.set_clock, time.monotonic, time.sleep)
+        if trace:
+            tracemalloc.start()
+            stack.callback(tracemalloc.stop)
+
+        wall = time.perf_counter()
+        submissions = rejected = 0
+        for i, script in enumerate(scripts, 1):
+            accepted, dropped = replay(script, recorder, clock)
+            submissions += accepted
+            rejected += dropped
+            traced = tracemalloc.get_traced_memory()[0] / 2**20 if trace else None
+            memory.append((i, traced, _rss_mb()))
+        wall = time.perf_counter() - wall
+
+    _report(recorder, submissions, rejected, memory, wall, len(sheet.rows))
+
+
+def _report(recorder, submissions, rejected, memory, wall, logged):
+    by_step = defaultdict(list)
+    for step, secs, _ in recorder.runs:
+        by_step[step].append(secs * 1000)
+
+    print(f"\n{'step':<12}{'runs':>6}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for step, ms in by_step.items():
+        print(f"{step:<12}{len(ms):>6}{sum(ms) / len(ms):>10.1f}{_pct(ms, 50):>9.1f}"
+              f"{_pct(ms, 95):>9.1f}{max(ms):>9.1f}")
+
+    if submissions:
+        print(f"\nReruns per submission: {len(by_step['submit']) / submissions:.2f}"
+              f"  ({submissions} submissions, {logged} rows reached the sheet,"
+              f" {rejected} rejected as duplicates)")
+    print(f"Wall time: {wall:.2f} s for {len(memory)} session(s)")
+
+    print(f"\n{'session':<10}{'traced MB':>11}{'peak RSS MB':>13}")
+    for i, traced, rss in memory:
+        print(f"{i:<10}{'-' if traced is None else f'{traced:.2f}':>11}{rss:>13.1f}")
+    if len(memory) > 1 and memory[0][1] is not None:
+        growth = (memory[-1][1] - memory[0][1]) / (len(memory) - 1)
+        print(f"Traced memory growth per session: {growth * 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("script", nargs="?", help="session script JSON")
+    parser.add_argument("--csv", help="rebuild the script from a logger CSV")
+    parser.add_argument("--participant", help="participant ID to replay from --csv")
+    parser.add_argument("--sessions", type=int, default=1, help="number of sessions to replay")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated LLM latency (s)")
+    parser.add_argument("--tracemalloc", action="store_true", help="trace Python heap (slows reruns)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.csv and not args.participant:
+        parser.error("--csv requires --participant")
+
+    rng = random.Random(args.seed)
+    if args.csv:
+        base = session_from_csv(args.csv, args.participant)
+        if not any(base["phases"]):
+            parser.error(f"no submissions for participant {args.participant!r} in {args.csv}")
+    elif args.script:
+        with open(args.script, encoding="utf-8") as f:
+            base = json.load(f)
+    else:
+        base = None
+
+    scripts = [
+        dict(base, participant=f"{base['participant']}-{i}") if base
+        else synthetic_session(rng, participant=f"BENCH-{i}")
+        for i in range(args.sessions)
+    ]
+    run(scripts, llm_latency=args.llm_latency, trace=args.tracemalloc, seed=args.seed)
@@ -0,0 +1,148 @@
+"""
+session_lifecycle.py – Lifecycle tracking and memory reclamation for
+participant sessions.
+
+Each Streamlit session owns a SessionLifecycle (kept in st.session_state)
+that moves from ACTIVE to COMPLETED or ABANDONED.  Leaving ACTIVE clears
+the session's large per-participant structures in place, so a server that
+runs for days keeps a flat resident footprint even while finished tabs
+stay open.  A process-wide SessionRegistry holds only weak references,
+sweeps idle sessions by TTL and reports where active sessions are in the
+study plus (sampled) per-session footprints.
+"""
+
+import sys
+import threading
+import weakref
+
+from timer import start_timer, elapsed
+
+ACTIVE = "active"
+COMPLETED = "completed"
+ABANDONED = "abandoned"
+
+IDLE_TTL_SEC = 20 * 60         # no interaction for this long → abandoned
+SWEEP_INTERVAL_SEC = 60        # at most one registry sweep per interval
+FOOTPRINT_INTERVAL_SEC = 60    # footprints are re-measured at most this often
+
+# st.session_state entries released when a session leaves ACTIVE
+HEAVY_KEYS = ("responses", "disqualified", "pending_futures")
+
+
+def _deep_size(obj, seen=None) -> int:
+    """Approximate retained size of plain containers (lists, dicts, sets, str)."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(k, seen) + _deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_size(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += _deep_size(vars(obj), seen)
+    return size
+
+
+def _phase_of(session_state):
+    if not session_state.get("started"):
+        return "consent"
+    if session_state.get("recess_mode"):
+        return "recess"
+    session = session_state.get("session")
+    return session.phase_index if session is not None else None
+
+
+class SessionLifecycle:
+    def __init__(self, participant: str = ""):
+        self.participant = participant
+        self.state = ACTIVE
+        self.last_seen = start_timer()
+        self.position = ("consent", None)   # (phase index | "consent" | "recess", group_id)
+        self._lock = threading.Lock()
+        self._heavy = {}
+
+    def touch(self, session_state):
+        """Mark user activity and track the current heavy structures."""
+        with self._lock:
+            self.last_seen = start_timer()
+            if self.state == ACTIVE:
+                self._heavy = {k: session_state[k] for k in HEAVY_KEYS if k in session_state}
+                if "session" in session_state:
+                    self._heavy["session"] = session_state["session"]
+                self.position = (_phase_of(session_state), session_state.get("group_id"))
+
+    def idle_sec(self) -> float:
+        return elapsed(self.last_seen)
+
+    def release(self, new_state: str):
+        """Leave ACTIVE and clear tracked structures in place (any thread)."""
+        with self._lock:
+            if self.state != ACTIVE:
+                return
+            self.state = new_state
+            for value in self._heavy.values():
+                if isinstance(value, (list, dict, set)):
+                    value.clear()
+                elif hasattr(value, "release"):
+                    value.release()
+            self._heavy = {}
+
+    def footprint_bytes(self) -> int:
+        """Approximate memory held by this session's tracked structures."""
+        with self._lock:
+            return _deep_size(self._heavy)
+
+
+class SessionRegistry:
+    """Process-wide, weakly-referenced view of all live sessions."""
+
+    def __init__(self, ttl_sec: float = IDLE_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self._sessions = weakref.WeakSet()
+        self._lock = threading.Lock()
+        self._last_sweep = start_timer()
+        self._footprints = None           # (measured at, stats) – see stats()
+
+    def register(self, lifecycle: SessionLifecycle):
+        with self._lock:
+            self._sessions.add(lifecycle)
+
+    def sweep(self, force: bool = False) -> int:
+        """Abandon sessions idle beyond the TTL; returns how many were evicted."""
+        with self._lock:
+            if not force and elapsed(self._last_sweep) < SWEEP_INTERVAL_SEC:
+                return 0
+            self._last_sweep = start_timer()
+            sessions = list(self._sessions)
+        evicted = 0
+        for lc in sessions:
+            if lc.state == ACTIVE and lc.idle_sec() > self.ttl_sec:
+                lc.release(ABANDONED)
+                evicted += 1
+        return evicted
+
+    def stats(self) -> dict:
+        """Session counts per state, active sessions per phase/group, and
+        per-session memory footprints (bytes).
+
+        Counts are O(sessions) and exact; footprints walk every session's
+        data, so they are re-measured at most every FOOTPRINT_INTERVAL_SEC."""
+        with self._lock:
+            sessions = list(self._sessions)
+        counts = {ACTIVE: 0, COMPLETED: 0, ABANDONED: 0}
+        by_phase_group = {}
+        for lc in sessions:
+            counts[lc.state] += 1
+            if lc.state == ACTIVE:
+                key = "%s|%s" % lc.position
+                by_phase_group[key] = by_phase_group.get(key, 0) + 1
+        if self._footprints is None or elapsed(self._footprints[0]) >= FOOTPRINT_INTERVAL_SEC:
+            footprints = [lc.footprint_bytes() for lc in sessions]
+            self._footprints = (start_timer(), {
+                "footprint_total": sum(footprints),
+                "footprint_max": max(footprints, default=0),
+                "footprint_mean": sum(footprints) / len(footprints) if footprints else 0,
+            })
+        return {"sessions": counts, "active_by_phase_group": by_phase_group, **self._footprints[1]}
@@ -0,0 +1,40 @@
+import copy
+import json
+
+import pytest
+
+from catalog import Catalog, STUDY_FILE
+
+with open(STUDY_FILE, encoding="utf-8") as f:
+    STUDY = json.load(f)
+
+
+def test_shipped_study_reproduces_original_groups():
+    groups = Catalog(STUDY).groups
+    assert [(g.objects, g.hints) for g in groups] == [
+        (("brick", "newspaper"), True), (("brick", "newspaper"), False),
+        (("newspaper", "brick"), True), (("newspaper", "brick"), False),
+    ]
+
+
+def test_object_errors_surface_at_load_time():
+    study = copy.deepcopy(STUDY)
+    study["objects"]["newspaper"]["suggestions"].append("Typo")
+    with pytest.raises(ValueError, match="newspaper"):
+        Catalog(study)
+
+
+def test_phase_errors_surface_at_load_time():
+    study = copy.deepcopy(STUDY)
+    del study["phases"][0]["duration_sec"]
+    with pytest.raises(ValueError, match="phase 0"):
+        Catalog(study)
+
+
+def test_group_assignment_is_stable_and_balanced():
+    catalog = Catalog(STUDY)
+    assert catalog.assign_group("P00042") == Catalog(STUDY).assign_group("P00042")
+    counts = [0] * len(catalog.groups)
+    for i in range(4000):
+        counts[catalog.assign_group(f"P{i:05d}")] += 1
+    assert min(counts) > 800
@@ -0,0 +1,47 @@
+import csv
+
+import pytest
+
+import logger
+
+OLD_FIELDNAMES = logger.FIELDNAMES[:13]
+
+
+@pytest.fixture
+def csv_log(tmp_path, monkeypatch):
+    path = tmp_path / "responses.csv"
+    monkeypatch.setattr(logger, "LOGFILE", str(path))
+    monkeypatch.setattr(logger, "USE_SHEETS", False)
+    monkeypatch.setattr(logger, "_csv_checked", False)
+    return path
+
+
+def _write(path, header, *rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows([header, *rows])
+
+
+def test_old_header_is_extended_in_place(csv_log):
+    old_row = [f"v{i}" for i in range(len(OLD_FIELDNAMES))]
+    _write(csv_log, OLD_FIELDNAMES, old_row)
+
+    logger.log({"participant": "P1", "category": "Doorstop", "category_source": "local"})
+
+    with open(csv_log, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == logger.FIELDNAMES
+    assert rows[0]["response_time_sec_phase"] == old_row[OLD_FIELDNAMES.index("response_time_sec_phase")]
+    assert rows[0]["category_source"] == ""
+    assert (rows[1]["participant"], rows[1]["category_source"]) == ("P1", "local")
+
+
+def test_unknown_header_is_rotated(csv_log, tmp_path):
+    _write(csv_log, ["participant", "answer"], ["P0", "x"])
+
+    logger.log({"participant": "P1"})
+
+    rotated = [p for p in tmp_path.iterdir() if p.name != "responses.csv"]
+    assert len(rotated) == 1 and rotated[0].read_text().startswith("participant,answer")
+    with open(csv_log, newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == logger.FIELDNAMES and len(rows) == 2
@@ -0,0 +1,45 @@
+import os
+
+import numpy as np
+import pytest
+
+import originality_index
+from originality_index import ObjectIndex
+
+
+def test_vectors_survive_growth_and_reload(tmp_path, monkeypatch):
+    monkeypatch.setattr(originality_index, "INITIAL_CAPACITY", 4)
+    uses = ["build a wall", "doorstop", "paperweight", "garden border", "bookend", "grind into pigment"]
+
+    index = ObjectIndex("brick", str(tmp_path))
+    for use in uses:
+        index.add([use])
+    before = index.cluster_counts(uses)
+    index.close()
+
+    assert sorted(os.listdir(tmp_path)) == ["brick.npy", "brick.txt"]
+    reloaded = ObjectIndex("brick", str(tmp_path))
+    assert len(reloaded) == len(uses)
+    assert np.array_equal(reloaded.cluster_counts(uses), before)
+    assert (before >= 1).all()          # every use matches at least itself
+
+
+def _csv(tmp_path, *uses):
+    path = tmp_path / "responses.csv"
+    lines = ["participant,object,use_text"] + [f"P1,brick,{u}" for u in uses]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_build_refuses_a_directory_another_writer_holds(tmp_path, capsys):
+    fcntl = pytest.importorskip("fcntl")
+    directory = tmp_path / "index"
+    directory.mkdir()
+    with open(directory / originality_index.LOCK_FILE, "a+") as held:   # stands in for the app
+        fcntl.flock(held, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        with pytest.raises(originality_index.IndexInUseError):
+            originality_index.build(_csv(tmp_path, "doorstop"), str(directory))
+        assert not (directory / "brick.txt").exists()
+
+        originality_index.score(_csv(tmp_path, "doorstop"), str(directory))   # readers are fine
+        assert "originality" in capsys.readouterr().out
@@ -0,0 +1,98 @@
+import pytest
+
+import pre_classifier
+from pre_classifier import predict, DISQUALIFIED, CONFIDENCE_THRESHOLD
+
+
+@pytest.mark.parametrize("use", [
+    "build a 1000 piece puzzle",
+    "html page mockup",
+    "use in a 2000s themed party",
+])
+def test_digits_and_acronyms_are_not_disqualified(use):
+    label, _ = predict(use, "brick")
+    assert label != DISQUALIFIED
+
+
+@pytest.mark.parametrize("use", ["paint a wall mural", "play the drums"])
+def test_single_keyword_hit_escalates(use):
+    _, confidence = predict(use, "brick")
+    assert confidence < CONFIDENCE_THRESHOLD
+
+
+@pytest.mark.parametrize("use", ["asdfghjkl", "qwrtplk sdfgh", "zzzzzz"])
+def test_gibberish_is_flagged_but_escalated(use):
+    label, confidence = predict(use, "brick")
+    assert label == DISQUALIFIED
+    assert confidence < CONFIDENCE_THRESHOLD
+
+
+@pytest.mark.parametrize("use", ["!!!!", "1234", "brick", "Bricks"])
+def test_no_letters_or_object_name_is_disqualified_locally(use):
+    label, confidence = predict(use, "brick")
+    assert label == DISQUALIFIED
+    assert confidence >= CONFIDENCE_THRESHOLD
+
+
+def test_exact_category_name_resolves_locally():
+    assert predict("doorstop", "brick") == ("Doorstop", 0.99)
+
+
+def test_unknown_object_is_uncategorized():
+    assert predict("build a wall", "teapot") == (pre_classifier.UNCATEGORIZED, 0.0)
+
+
+def test_classify_reports_source(monkeypatch):
+    calls = []
+    monkeypatch.setattr(pre_classifier.llm_client, "map_to_category",
+                        lambda use, obj, cats: calls.append(use) or "Art/Decoration")
+    monkeypatch.setattr(pre_classifier, "SHADOW_RATE", 0.0)
+
+    assert pre_classifier.classify_with_source("doorstop", "brick", "") == ("Doorstop", "local", 0.99)
+    assert pre_classifier.classify_with_source("paint a wall mural", "brick", "") == (
+        "Art/Decoration", "llm", "")
+    assert calls == ["paint a wall mural"]
+
+
+def test_predict_is_safe_while_another_thread_learns(monkeypatch):
+    import sys
+    import threading
+    from collections import defaultdict
+
+    monkeypatch.setattr(pre_classifier, "_learned", defaultdict(dict))
+    monkeypatch.setattr(pre_classifier, "_learned_entries", defaultdict(list))
+    monkeypatch.setattr(pre_classifier, "_learned_index", defaultdict(lambda: defaultdict(list)))
+    errors, done = [], threading.Event()
+
+    def teach():
+        for i in range(3000):
+            pre_classifier.learn(f"stack them into a tower number {i}", "brick", "Building/Construction")
+        done.set()
+
+    def ask():
+        try:
+            while not done.is_set():
+                predict("stack them up in a tower, numbered", "brick")  # never an exact repeat
+        except Exception as e:
+            errors.append(e)
+            done.set()
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)             # interleave the threads aggressively
+    threads = [threading.Thread(target=teach)] + [threading.Thread(target=ask) for _ in range(3)]
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert errors == []
+
+
+def test_warm_up_compiles_the_object_ahead_of_use(monkeypatch):
+    monkeypatch.setattr(pre_classifier, "_lexicons", {})
+    pre_classifier.warm_up("newspaper")
+    assert "newspaper" in pre_classifier._lexicons
+    pre_classifier.warm_up("teapot")            # not in the catalog: no-op
+    assert "teapot" not in pre_classifier._lexicons
@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+import timer
+from feedback_engine import SessionState
+from session_lifecycle import (SessionLifecycle, SessionRegistry, ACTIVE, COMPLETED, ABANDONED,
+                               SWEEP_INTERVAL_SEC)
+
+
+class _Session:
+    phase_index = 1
+
+    def release(self):
+        pass
+
+
+def _touched(**state):
+    lc = SessionLifecycle("P1")
+    lc.touch({"session": _Session(), "responses": [], **state})
+    return lc
+
+
+def test_stats_count_every_live_session_by_phase_and_group():
+    registry = SessionRegistry()
+    sessions = [
+        _touched(started=False, group_id=0),
+        _touched(started=True, recess_mode=True, group_id=2),
+        _touched(started=True, recess_mode=False, group_id=2),
+        _touched(started=True, recess_mode=False, group_id=3),
+    ]
+    for lc in sessions:
+        registry.register(lc)
+    sessions[3].release(COMPLETED)
+
+    stats = registry.stats()
+    assert stats["sessions"] == {"active": 3, "completed": 1, "abandoned": 0}
+    assert stats["active_by_phase_group"] == {"consent|0": 1, "recess|2": 1, "1|2": 1}
+
+
+@pytest.fixture
+def clock():
+    now = [1000.0]
+    timer.set_clock(lambda: now[0], lambda s: now.__setitem__(0, now[0] + s))
+    yield now
+    timer.set_clock(time.monotonic, time.sleep)
+
+
+def _participant_state():
+    session = SessionState(objects=["brick", "newspaper"])
+    session.used_categories = {"doorstop", "paperweight"}
+    return {
+        "started": True,
+        "session": session,
+        "responses": [{"use_text": f"use {i}", "category": "Doorstop"} for i in range(20)],
+        "disqualified": ["asdf"],
+        "pending_futures": [],
+    }
+
+
+def test_sweep_abandons_only_sessions_idle_past_the_ttl(clock):
+    registry = SessionRegistry(ttl_sec=60)
+    idle, busy = SessionLifecycle("idle"), SessionLifecycle("busy")
+    idle_state, busy_state = _participant_state(), _participant_state()
+    for lc, state in ((idle, idle_state), (busy, busy_state)):
+        lc.touch(state)
+        registry.register(lc)
+
+    clock[0] += SWEEP_INTERVAL_SEC + 1
+    busy.touch(busy_state)
+    assert registry.sweep() == 1
+    assert (idle.state, busy.state) == (ABANDONED, ACTIVE)
+    assert idle_state["responses"] == [] and busy_state["responses"] != []
+
+
+def test_sweep_is_rate_limited(clock):
+    registry = SessionRegistry(ttl_sec=0)
+    lc = SessionLifecycle("P1")
+    lc.touch(_participant_state())
+    registry.register(lc)
+    clock[0] += 1
+    assert registry.sweep() == 0 and lc.state == ACTIVE
+    assert registry.sweep(force=True) == 1 and lc.state == ABANDONED
+
+
+def test_release_empties_structures_in_place():
+    state = _participant_state()
+    responses, session = state["responses"], state["session"]
+    lc = SessionLifecycle("P1")
+    lc.touch(state)
+    assert lc.footprint_bytes() > 0
+
+    lc.release(COMPLETED)
+    assert responses == [] and state["disqualified"] == []
+    assert session.used_categories == set()
+    assert lc.footprint_bytes() < 100
+    lc.release(ABANDONED)                  # leaving ACTIVE happens once
+    assert lc.state == COMPLETED
+
+
+def test_footprint_gauge_tracks_held_data(clock):
+    registry = SessionRegistry()
+    small, large = SessionLifecycle("small"), SessionLifecycle("large")
+    small.touch(_participant_state())
+    large_state = _participant_state()
+    large_state["responses"] *= 50
+    large.touch(large_state)
+    registry.register(small)
+    registry.register(large)
+
+    stats = registry.stats()
+    assert stats["footprint_max"] == large.footprint_bytes() > small.footprint_bytes()
+    assert stats["footprint_total"] == small.footprint_bytes() + large.footprint_bytes()
@@ -0,0 +1,73 @@
+import pytest
+
+import usage_ledger
+
+
+@pytest.fixture
+def ledger(monkeypatch, tmp_path):
+    """Isolated ledger file and listeners; drained before the patches are undone."""
+    path = tmp_path / "ledger.jsonl"
+    monkeypatch.setattr(usage_ledger, "LEDGERFILE", str(path))
+    monkeypatch.setattr(usage_ledger, "_listeners", {})
+    yield path
+    usage_ledger.flush()
+
+
+def test_failing_listener_does_not_break_recording(ledger):
+    seen = []
+
+    def broken(row):
+        raise RuntimeError("listener bug")
+
+    usage_ledger.add_listener("broken", broken)
+    usage_ledger.add_listener("seen", seen.append)
+    usage_ledger.record("map_to_category", "gpt-4.1-mini", 0.2, "ok")
+    assert [r["call_type"] for r in seen] == ["map_to_category"]
+
+
+def test_listener_is_replaced_by_name(ledger):
+    first, second = [], []
+    usage_ledger.add_listener("live_stats", first.append)
+    usage_ledger.add_listener("live_stats", second.append)
+    usage_ledger.record("map_to_category", "gpt-4.1-mini", 0.2, "ok")
+    assert (len(first), len(second)) == (0, 1)
+
+
+def test_rows_go_to_the_ledger_file(ledger):
+    usage_ledger.record("map_to_category", "gpt-4.1-mini", 0.2, "ok")
+    usage_ledger.flush()
+    assert [r["latency_sec"] for r in usage_ledger.load(str(ledger))] == [0.2]
+
+
+def test_cost_prices_cached_tokens_at_the_cached_rate():
+    row = {"model": "gpt-4.1-mini-2025-04-14", "prompt_tokens": 1_000_000,
+           "cached_tokens": 400_000, "completion_tokens": 500_000}
+    p_in, p_cached, p_out = usage_ledger.PRICES["gpt-4.1-mini"]
+    assert usage_ledger.cost_usd(row) == pytest.approx(0.6 * p_in + 0.4 * p_cached + 0.5 * p_out)
+
+
+def test_unknown_model_costs_nothing():
+    assert usage_ledger.cost_usd({"model": "local", "prompt_tokens": 1000, "completion_tokens": 10}) == 0.0
+
+
+@pytest.mark.parametrize("pct, expected", [(50, 5), (95, 10), (10, 1), (100, 10)])
+def test_percentile_is_nearest_rank(pct, expected):
+    assert usage_ledger.percentile(list(range(10, 0, -1)), pct) == expected
+
+
+def test_percentile_of_nothing_is_none():
+    assert usage_ledger.percentile([], 50) is None
+
+
+def test_summarize_groups_latency_and_cost_per_participant():
+    rows = [
+        {"participant": p, "latency_sec": lat, "outcome": outcome, "model": "gpt-4.1-mini",
+         "prompt_tokens": 100, "completion_tokens": 10, "cached_tokens": 0}
+        for p, lat, outcome in [("P1", 0.1, "ok"), ("P1", 0.3, "ok"), ("P1", 2.0, "error"), ("P2", 0.5, "ok")]
+    ]
+    table = usage_ledger.summarize(rows, "participant")
+    assert list(table) == ["P1", "P2"]
+    assert table["P1"]["calls"] == 3 and table["P1"]["errors"] == 1
+    assert (table["P1"]["p50_sec"], table["P1"]["p95_sec"]) == (0.3, 2.0)
+    assert table["P1"]["tokens"] == 330
+    assert table["P1"]["cost_usd"] == pytest.approx(3 * usage_ledger.cost_usd(rows[0]))
@@ -1,8 +1,19 @@
-
 import time
 
+# Clock and sleep behind every app timing call; replay_bench swaps them
+# via set_clock() to compress a session into seconds.
+_clock = time.monotonic
+_sleep = time.sleep
+
+def set_clock(clock, sleep):
+    global _clock, _sleep
+    _clock, _sleep = clock, sleep
+
 def start_timer():
-    return time.monotonic()
+    return _clock()
 
 def elapsed(start_time):
-    return time.monotonic() - start_time
+    return _clock() - start_time
+
+def pause(seconds):
+    _sleep(seconds)
@@ -0,0 +1,182 @@
+"""
+usage_ledger.py – Per-call LLM usage ledger for the AUT Flexibility app.
+
+Every OpenAI call made by llm_client is recorded with its model, call
+type, token counts, latency, retries and outcome, tagged with the
+participant/phase set via set_context().  Records are appended to a
+local JSONL file by a background thread, so the UI never waits on disk.
+
+Summary of a ledger file (p50/p95 latency and cost):
+
+    python usage_ledger.py [llm_usage.jsonl]
+"""
+
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+import contextvars
+from collections import defaultdict
+
+LEDGERFILE = "llm_usage.jsonl"     # local append-only store
+ENABLED = True                     # set False to disable the ledger
+
+# USD per 1M tokens: (input, cached input, output)
+PRICES = {
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+}
+
+# Tags (participant, phase, ...) for calls made by the current script thread
+_context = contextvars.ContextVar("usage_context", default={})
+
+_queue = queue.Queue()
+_listeners = {}                    # name → callable fed every row (e.g. live_stats)
+_writer = None
+_writer_lock = threading.Lock()
+
+
+# --------------------------------------------------------------------
+# Recording
+# --------------------------------------------------------------------
+def set_context(**tags):
+    """Tag subsequent LLM calls on this thread (participant, phase_index, ...)."""
+    _context.set(dict(tags))
+
+
+def add_listener(name: str, fn):
+    """Call fn(row) for every recorded row, on the recording thread.
+
+    Registering again under the same name replaces the old listener (e.g.
+    when a cached LiveStats is rebuilt)."""
+    _listeners[name] = fn
+
+
+def record(call_type: str, model: str, latency_sec: float, outcome: str,
+           usage=None, retries: int = 0):
+    """Queue one ledger row; never blocks on I/O."""
+    if not ENABLED:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    row = {
+        "ts": time.time(),
+        **_context.get(),
+        "call_type": call_type,
+        "model": model,
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "cached_tokens": getattr(details, "cached_tokens", 0) or 0,
+        "latency_sec": round(latency_sec, 4),
+        "retries": retries,
+        "outcome": outcome,
+    }
+    _queue.put(row)
+    _ensure_writer()
+    for name, fn in list(_listeners.items()):
+        try:
+            fn(row)
+        except Exception as e:      # never turn a recorded call into a failed one
+            print(f"Usage ledger listener {name!r} failed:", e, file=sys.stderr)
+
+
+def _ensure_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = threading.Thread(target=_write_loop, name="usage-ledger", daemon=True)
+                _writer.start()
+                atexit.register(flush)
+
+
+def _write_loop():
+    """Drain the queue in batches so each wake-up costs one file append."""
+    while True:
+        batch = [_queue.get()]
+        while True:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            with open(LEDGERFILE, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(r) + "\n" for r in batch)
+        except Exception as e:
+            print("Usage ledger write failed:", e, file=sys.stderr)
+        for _ in batch:
+            _queue.task_done()
+
+
+def flush(timeout: float = 5.0):
+    """Wait (up to timeout) until every queued row is on disk."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+# --------------------------------------------------------------------
+# Summary
+# --------------------------------------------------------------------
+def cost_usd(row: dict) -> float:
+    """Price one ledger row; unknown models cost 0."""
+    model = row.get("model", "")
+    key = max((k for k in PRICES if model.startswith(k)), key=len, default=None)
+    if key is None:
+        return 0.0
+    p_in, p_cached, p_out = PRICES[key]
+    cached = row.get("cached_tokens", 0)
+    return (
+        (row.get("prompt_tokens", 0) - cached) * p_in
+        + cached * p_cached
+        + row.get("completion_tokens", 0) * p_out
+    ) / 1_000_000
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile (None for no values); also used by live_stats."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def load(path: str = LEDGERFILE) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(rows: list, key: str) -> dict:
+    """Group rows by `key` → calls, errors, p50/p95 latency, tokens, cost."""
+    groups = defaultdict(list)
+    for r in rows:
+        groups[str(r.get(key, ""))].append(r)
+    out = {}
+    for name, group in sorted(groups.items()):
+        latencies = [r["latency_sec"] for r in group]
+        out[name] = {
+            "calls": len(group),
+            "errors": sum(r["outcome"] != "ok" for r in group),
+            "p50_sec": percentile(latencies, 50),
+            "p95_sec": percentile(latencies, 95),
+            "tokens": sum(r["prompt_tokens"] + r["completion_tokens"] for r in group),
+            "cost_usd": sum(cost_usd(r) for r in group),
+        }
+    return out
+
+
+def _print_table(title: str, table: dict):
+    print(f"\n{title}")
+    print(f"{'':<28}{'calls':>7}{'errors':>8}{'p50 s':>9}{'p95 s':>9}{'tokens':>10}{'cost $':>10}")
+    for name, s in table.items():
+        print(f"{name or '-':<28}{s['calls']:>7}{s['errors']:>8}{s['p50_sec']:>9.3f}"
+              f"{s['p95_sec']:>9.3f}{s['tokens']:>10}{s['cost_usd']:>10.4f}")
+
+
+if __name__ == "__main__":
+    rows = load(sys.argv[1] if len(sys.argv) > 1 else LEDGERFILE)
+    _print_table("By call type", summarize(rows, "call_type"))
+    _print_table("By phase", summarize(rows, "phase_index"))
+    _print_table("By participant", summarize(rows, "participant"))
+    print(f"\nTotal: {len(rows)} calls, ${sum(cost_usd(r) for r in rows):.4f}")